@@ -0,0 +1,160 @@
+import io
+import json
+import os
+import struct
+
+import pygame
+
+MAGIC = b"TOBYASSETS2\n"
+MIXER_FORMAT = (44100, -16, 2)  # one fixed format so every run mixes the same, sdl converts for the device
+
+# name -> (png, scale, mirrored)
+SPRITES = {
+    "dog_closed": ("img/dog_closed.png", 5, True),
+    "dog_open": ("img/dog_open.png", 5, True),
+    "dog_walk_1": ("img/dog_walk_1.png", 5, True),
+    "dog_walk_2": ("img/dog_walk_2.png", 5, True),
+    "poison_point": ("img/poison_point.png", 2, False),
+}
+SOUNDS = {
+    "flip": "sfx/flip.mp3",
+    "hurt": "sfx/hurt.mp3",
+    "heal": "sfx/heal.mp3",
+}
+
+def init_mixer():
+    """open the mixer in MIXER_FORMAT, sdl converts if the device wants something else"""
+
+    if not pygame.mixer.get_init():
+        pygame.mixer.init(*MIXER_FORMAT, allowedchanges=0)
+
+def source_stamps(base_dir):
+    """size and mtime of every source file plus the spec, if any of it changes the bundle is stale"""
+
+    stamps = {"sprites": SPRITES, "sounds": SOUNDS, "files": {}}
+    for path in [p for p, _, _ in SPRITES.values()] + list(SOUNDS.values()):
+        st = os.stat(os.path.join(base_dir, path))
+        stamps["files"][path] = [st.st_size, st.st_mtime_ns]
+    return json.loads(json.dumps(stamps))  # tuples -> lists, same as it comes back out of the file
+
+def build(base_dir):
+    """
+    scale and mirror every sprite into one png atlas and copy the mp3s in as they are,
+    returns the bundle as bytes: MAGIC, index length, json index, then the blobs
+    (sounds stay mp3, decoded pcm was 10x the size and they're loaded off the main thread anyway)
+
+    needs the display mode set (for convert_alpha)
+    """
+
+    sprites = []
+    for name, (path, scale, mirrored) in SPRITES.items():
+        image = pygame.image.load(os.path.join(base_dir, path)).convert_alpha()
+        image = pygame.transform.scale(image, (image.get_width() * scale, image.get_height() * scale))
+        if mirrored:
+            image = pygame.transform.flip(image, True, False)
+        sprites.append((name, image))
+
+    # one strip, they're all small
+    width = sum(image.get_width() for _, image in sprites)
+    height = max(image.get_height() for _, image in sprites)
+    atlas = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+    index = {"stamps": source_stamps(base_dir), "sprites": {}, "sounds": {}}
+    x = 0
+    for name, image in sprites:
+        atlas.blit(image, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)  # onto transparent black that's a straight copy
+        index["sprites"][name] = [x, 0, image.get_width(), image.get_height()]
+        x += image.get_width()
+
+    blobs = []
+    offset = 0
+
+    def add_blob(data):
+        nonlocal offset
+        blobs.append(data)
+        offset += len(data)
+        return [offset - len(data), len(data)]
+
+    png = io.BytesIO()
+    pygame.image.save(atlas, png, "atlas.png")
+    index["atlas"] = {"size": [width, height], "blob": add_blob(png.getvalue())}
+
+    for name, path in SOUNDS.items():
+        with open(os.path.join(base_dir, path), "rb") as f:
+            index["sounds"][name] = add_blob(f.read())
+
+    index_bytes = json.dumps(index).encode()
+    return MAGIC + struct.pack("<I", len(index_bytes)) + index_bytes + b"".join(blobs)
+
+class AssetBundle:
+    """a loaded bundle, sprites come out as subsurfaces of the atlas and sounds as pygame Sounds"""
+
+    def __init__(self, data):
+        if not data.startswith(MAGIC):
+            raise ValueError("not an asset bundle (or one from an older version), run python build_assets.py")
+        start = len(MAGIC) + 4
+        (index_length,) = struct.unpack_from("<I", data, len(MAGIC))
+        self.index = json.loads(data[start:start + index_length])
+        self.payload = memoryview(data)[start + index_length:]
+        self.atlas = None
+
+    def blob(self, location):
+        offset, length = location
+        return self.payload[offset:offset + length]
+
+    def sprite(self, name):
+        """needs the display mode set, the atlas gets converted the first time"""
+
+        if self.atlas is None:
+            png = io.BytesIO(self.blob(self.index["atlas"]["blob"]))
+            self.atlas = pygame.image.load(png, "atlas.png").convert_alpha()
+        return self.atlas.subsurface(pygame.Rect(self.index["sprites"][name]))
+
+    def sound(self, name):
+        """needs the mixer open, decodes the mp3 so keep it off the main thread"""
+
+        return pygame.mixer.Sound(file=io.BytesIO(self.blob(self.index["sounds"][name])))
+
+class SpriteCache:
+    """
+    bundle sprites scaled and flipped once and then shared, so every speaker drawn
+    at the same size and facing the same way blits the very same surfaces
+    """
+
+    def __init__(self, assets):
+        self.assets = assets
+        self.sprites = {}  # (name, scale, flipped) -> surface
+
+    def get(self, name, scale=1, flipped=False):
+        key = (name, scale, flipped)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.assets.sprite(name)
+            if scale != 1:
+                size = (round(sprite.get_width() * scale), round(sprite.get_height() * scale))
+                sprite = pygame.transform.scale(sprite, size)  # nearest neighbour, stays pixel art
+            if flipped:
+                sprite = pygame.transform.flip(sprite, True, False)
+            self.sprites[key] = sprite
+        return sprite
+
+    def __len__(self):
+        return len(self.sprites)
+
+def load_assets(bundle_path, base_dir=None):
+    """
+    read the bundle in one go, it's only ever built by build_assets.py, never here
+    (warns if base_dir has sources newer than the bundle, frozen builds don't ship them)
+    """
+
+    if not os.path.exists(bundle_path):
+        raise FileNotFoundError(f"no {bundle_path}, run python build_assets.py first")
+    with open(bundle_path, "rb") as f:
+        bundle = AssetBundle(f.read())
+    if base_dir is not None and os.path.isdir(os.path.join(base_dir, "img")):
+        try:
+            stale = bundle.index["stamps"] != source_stamps(base_dir)
+        except OSError:
+            stale = True
+        if stale:
+            print(f"{bundle_path} is older than img/ or sfx/, run python build_assets.py to pick up the changes")
+    return bundle
@@ -0,0 +1,299 @@
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import time
+import wave
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # no window, mic or tts voice needed
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame
+
+import full_radiation as game
+from frame_scheduler import percentile
+from lip_sync import MouthTrack
+from text_layout import Scrollback, TextLayout
+
+SENTENCE = ("Toby radiation Fox here with a very long update about Delta Rune chapter five and "
+            "the Roaring night so please bear with me while Rossi and Chris figure out TV time").split()
+
+# === SCENARIOS ===
+# each one sets the game's globals up for frame i the way the main loop would, then draw_text() draws it
+
+def idle(i):
+    if i == 0:
+        game.speech.display_words = SENTENCE[:8]
+    game.dog_state = game.dog_closed
+
+def speaking(i):
+    if i % 40 == 0:
+        game.speech.display_words = ["*"]
+    if i % 5 == 0:
+        game.speech.display_words.append(SENTENCE[i // 5 % len(SENTENCE)])
+    game.speech.speaking = True
+    if i % 3 == 0:  # the 0.1 s mouth toggle at 33 fps
+        game.dog_state = game.dog_open if game.dog_state is game.dog_closed else game.dog_closed
+
+def long_paragraphs(i):
+    if i % 300 == 0:
+        game.speech.display_words = ["*"] + SENTENCE * 6
+    game.speech.display_words.append(SENTENCE[i % len(SENTENCE)])  # a word every frame, so it keeps rewrapping
+    game.speech.speaking = True
+    if i % 3 == 0:
+        game.dog_state = game.dog_open if game.dog_state is game.dog_closed else game.dog_closed
+
+def monologue(i):
+    if i == 0:
+        game.speech.display_words = Scrollback(["*"], game.speech.SCROLLBACK_WORDS)
+    game.speech.display_words.append(SENTENCE[i % len(SENTENCE)])  # one line that never ends, should cost the same at frame 10000 as at 100
+    game.speech.speaking = True
+    if i % 3 == 0:
+        game.dog_state = game.dog_open if game.dog_state is game.dog_closed else game.dog_closed
+
+def poisoned(i):
+    game.poisoned = True
+    speaking(i)
+
+def mid_flip(i):
+    if i % 23 == 0:  # a whole flip is 0.7 s
+        game.flip_elapsed = 0.0
+    game.dog_flipping = True
+    game.dog_state = game.dog_closed
+    game.flip_elapsed += 1 / game.speech.TARGET_FPS
+
+def walk_in(i):
+    game.walk_in_timer = game.walk_in_timer_time - (i % 83) / game.speech.TARGET_FPS
+    if i % 6 == 0:  # 0.2 s walk toggle
+        game.dog_state = game.dog_walk_1 if game.dog_state is game.dog_walk_2 else game.dog_walk_2
+
+SCENARIOS = {
+    "idle": idle,
+    "speaking": speaking,
+    "long_paragraphs": long_paragraphs,
+    "monologue": monologue,
+    "poisoned": poisoned,
+    "mid_flip": mid_flip,
+    "walk_in": walk_in,
+}
+
+def reset():
+    """back to the state the main loop is in once the walk-in is over"""
+
+    game.speech.display_words = []
+    game.speech.speaking = False
+    game.poisoned = False
+    game.dog_flipping = False
+    game.flip_elapsed = 0.0
+    game.walk_in_timer = 0
+    game.dog_state = game.dog_closed
+    game.text_layout.clear()
+    game.renderer.invalidate()
+
+def run_scenario(scenario, frames, warmup):
+    """draw frames as fast as they go, returns per frame ms of draw_text() (including pushing it to the display)"""
+
+    reset()
+    times = []
+    for i in range(warmup + frames):
+        scenario(i)
+        start = time.perf_counter()
+        game.draw_text()
+        if i >= warmup:
+            times.append((time.perf_counter() - start) * 1000)
+    reset()
+    return times
+
+def time_function(fn, min_time):
+    """ms per call, calling it until min_time seconds have gone by"""
+
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / calls * 1000
+
+def fake_speech(seconds, rate=22050):
+    """wav bytes of a tone that comes and goes about as often as syllables do"""
+
+    import numpy as np
+
+    t = np.arange(int(seconds * rate)) / rate
+    samples = np.sin(2 * np.pi * 180 * t) * (np.sin(2 * np.pi * 4 * t) > 0) * 12000
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.astype(np.int16).tobytes())
+    return out.getvalue()
+
+def function_timings(min_time):
+    paragraph = " ".join(SENTENCE * 3)
+    layout_words = paragraph.split()
+    speech = fake_speech(10)
+    track = MouthTrack(speech, game.speech.LIP_SYNC_WINDOW, game.speech.LIP_SYNC_THRESHOLD)
+
+    def layout():
+        text_layout = TextLayout(game.font, game.speech.TEXTBOX_WIDTH)  # fresh each time, so this is a full wrap + render
+        text_layout.sync(layout_words)
+        text_layout.render()
+
+    return {
+        "layout_paragraph": time_function(layout, min_time),
+        "tint_surface": time_function(lambda: game.tint_surface(game.dog_open, game.POISON_COLOR), min_time),
+        "rotate_image_around_pivot": time_function(
+            lambda: game.rotate_image_around_pivot(game.dog_open, (400, 300), game.flip_center_offset, 137), min_time
+        ),
+        "get_flip_frame_cached": time_function(lambda: game.get_flip_frame(game.dog_open, None, 137), min_time),
+        "process_text": time_function(lambda: game.speech.process_text(paragraph), min_time),
+        "mouth_track_10s_line": time_function(
+            lambda: MouthTrack(speech, game.speech.LIP_SYNC_WINDOW, game.speech.LIP_SYNC_THRESHOLD), min_time
+        ),
+        "mouth_track_lookup": time_function(lambda: track.open_at(4.321), min_time),
+    }
+
+def speaker_scaling(counts, frames, warmup, dirty_rects):
+    """
+    multi_speaker's draw_frame() with count speakers on screen, either all talking at once (out of step
+    with each other) or just one talking while the rest wait their turn, returns per frame stats for each count
+
+    all talking still costs about linearly more per speaker, every one of them has new words and a mouth
+    to redraw, only the quiet ones are nearly free and the sprite cache stays the same size
+    """
+
+    import multi_speaker
+
+    def run(talking):
+        times = []
+        for i in range(warmup + frames):
+            for n, speaker in enumerate(multi_speaker.speakers[:talking]):
+                j = i + n * 7
+                if j % 40 == 0:
+                    speaker.display_words = ["*"]
+                if j % 5 == 0:
+                    speaker.display_words.append(SENTENCE[j // 5 % len(SENTENCE)])
+                speaker.speaking = True
+                if j % 3 == 0:
+                    speaker.dog_state = speaker.dog_open if speaker.dog_state is speaker.dog_closed else speaker.dog_closed
+            start = time.perf_counter()
+            multi_speaker.draw_frame()
+            if i >= warmup:
+                times.append((time.perf_counter() - start) * 1000)
+        times.sort()
+        return sum(times) / len(times), percentile(times, 99)
+
+    results = {}
+    for count in counts:
+        configs = [
+            {"name": f"dog {n}", "mic": None, "scale": 1 if n % 2 == 0 else 0.6, "flipped": n % 2 == 1}
+            for n in range(count)
+        ]
+        multi_speaker.init_pygame(configs)
+        multi_speaker.renderer.enabled = dirty_rects
+        for speaker in multi_speaker.speakers:
+            speaker.display_words = ["*"] + SENTENCE[:12]  # everyone has something up from their last line
+        one_mean, one_p99 = run(1)
+        all_mean, all_p99 = run(count)
+        results[str(count)] = {
+            "frames": frames,
+            "one_talking_mean_ms": round(one_mean, 4),
+            "one_talking_p99_ms": round(one_p99, 4),
+            "all_talking_mean_ms": round(all_mean, 4),
+            "all_talking_p99_ms": round(all_p99, 4),
+            "sprites": len(multi_speaker.sprites),
+        }
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline):
+    """print how much every number moved since a previous --out file, lower is better for all of them but fps"""
+
+    for section in ("scenarios", "functions", "speakers"):
+        for name, new in results.get(section, {}).items():
+            old = baseline.get(section, {}).get(name)
+            if old is None:
+                continue
+            for key, value in (new.items() if isinstance(new, dict) else [("ms", new)]):
+                before = old.get(key) if isinstance(old, dict) else old
+                if key == "frames" or not before or not isinstance(value, (int, float)):
+                    continue
+                change = (value - before) / before * 100
+                print(f"{section[:-1]} {name} {key}: {before:.4g} -> {value:.4g} ({change:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="time full_radiation's rendering and text paths headless, no mic or tts voice needed"
+    )
+    parser.add_argument("--frames", type=int, default=600, help="frames timed per scenario")
+    parser.add_argument("--warmup", type=int, default=100, help="frames drawn first to fill the caches")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to spend timing each function")
+    parser.add_argument("--scenario", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--full-redraw", action="store_true", help="turn dirty rects off")
+    parser.add_argument("--speakers", nargs="+", type=int, default=[], metavar="COUNT",
+                        help="also time multi_speaker with this many speakers talking at once, e.g. 1 2 4 8")
+    parser.add_argument("--out", help="write the results to this json file")
+    parser.add_argument("--compare", help="a previous --out file to compare against")
+    parser.add_argument("--json", action="store_true", help="print the results as json")
+    args = parser.parse_args()
+
+    game.init_pygame()
+    game.renderer.enabled = not args.full_redraw
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "dirty_rects": game.renderer.enabled,
+        "scenarios": {},
+        "functions": {},
+    }
+    for name in args.scenario:
+        times = sorted(run_scenario(SCENARIOS[name], args.frames, args.warmup))
+        mean = sum(times) / len(times)
+        results["scenarios"][name] = {
+            "frames": len(times),
+            "fps": round(1000 / mean, 1),
+            "mean_ms": round(mean, 4),
+            "p50_ms": round(percentile(times, 50), 4),
+            "p99_ms": round(percentile(times, 99), 4),
+            "max_ms": round(times[-1], 4),
+        }
+    results["functions"] = {name: round(ms, 5) for name, ms in function_timings(args.min_time).items()}
+    if args.speakers:
+        results["speakers"] = speaker_scaling(args.speakers, args.frames, args.warmup, not args.full_redraw)
+    pygame.quit()
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for name, stats in results["scenarios"].items():
+            print(f"{name:>16}: {stats['fps']:>8} fps, p50 {stats['p50_ms']} ms p99 {stats['p99_ms']} ms")
+        for name, ms in results["functions"].items():
+            print(f"{name:>26}: {ms:.4f} ms per call")
+        for count, stats in results.get("speakers", {}).items():
+            print(
+                f"{count:>3} speakers: one talking {stats['one_talking_mean_ms']} ms (p99 {stats['one_talking_p99_ms']}), "
+                f"all talking {stats['all_talking_mean_ms']} ms (p99 {stats['all_talking_p99_ms']}), "
+                f"{stats['sprites']} sprites cached"
+            )
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import json
+import random
+import string
+import time
+
+from replacements import Replacer
+
+def legacy_process_text(text, custom_words):
+    """the old process_text, sort and str.replace every entry on every call"""
+
+    for phrase, replacement in sorted(custom_words.items(), key=lambda x: -len(x[0])):
+        if phrase in text:
+            text = text.replace(phrase, replacement)
+    return text
+
+def random_word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+
+def make_dictionary(rng, entries):
+    words = {}
+    while len(words) < entries:
+        phrase = " ".join(random_word(rng) for _ in range(rng.randint(1, 3)))
+        words[phrase] = phrase.title()
+    return words
+
+def make_transcript(rng, words, length):
+    """random words with a dictionary phrase mixed in every so often"""
+
+    phrases = list(words)
+    out = []
+    while len(out) < length:
+        out.append(rng.choice(phrases) if rng.random() < 0.1 else random_word(rng))
+    return " ".join(out)
+
+def time_calls(fn, text, min_time):
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn(text)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / calls
+
+def main():
+    parser = argparse.ArgumentParser(description="compare the compiled replacer against the old process_text")
+    parser.add_argument("--entries", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--words", type=int, nargs="+", default=[20, 500, 5000], help="transcript lengths in words")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to spend timing each case")
+    parser.add_argument("--json", action="store_true", help="print results as json lines")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for entries in args.entries:
+        words = make_dictionary(rng, entries)
+
+        start = time.perf_counter()
+        replacer = Replacer(words)
+        compile_time = time.perf_counter() - start
+
+        for length in args.words:
+            text = make_transcript(rng, words, length)
+            legacy = time_calls(lambda t: legacy_process_text(t, words), text, args.min_time)
+            compiled = time_calls(replacer.replace, text, args.min_time)
+            result = {
+                "entries": entries,
+                "words": length,
+                "chars": len(text),
+                "compile_ms": round(compile_time * 1000, 3),
+                "legacy_ms": round(legacy * 1000, 4),
+                "compiled_ms": round(compiled * 1000, 4),
+                "compiled_mb_per_s": round(len(text) / compiled / 1e6, 2),
+                "speedup": round(legacy / compiled, 1),
+            }
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print(f"{entries:>6} entries {length:>6} words: legacy {result['legacy_ms']:>9} ms, "
+                      f"compiled {result['compiled_ms']:>9} ms ({result['compiled_mb_per_s']} MB/s), "
+                      f"{result['speedup']}x, compile {result['compile_ms']} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import argparse
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # no window needed, just a display mode for convert_alpha
+import pygame
+
+from asset_bundle import build
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="bake the scaled and mirrored sprites and the sound effects into one bundle, "
+                    "run before running from source or pyinstaller, and again after changing img/ or sfx/"
+    )
+    parser.add_argument("--out", default="assets.bin", help="where to write the bundle")
+    parser.add_argument("--source", default=".", help="directory with img/ and sfx/")
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    data = build(args.source)
+    with open(args.out, "wb") as f:
+        f.write(data)
+    print(f"wrote {args.out} ({len(data) / 1024:.0f} KB)")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import pygame
+
+def merge_rects(rects):
+    """union overlapping rects together so no pixel is in more than one of them"""
+
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+class DirtyRenderer:
+    """
+    draws a frame given as a list of (surface, rect) and only pushes the parts of the
+    screen that differ from the last frame with pygame.display.update(rects)
+    """
+
+    def __init__(self, screen, background=(0, 0, 0), enabled=True, present=None):
+        self.screen = screen
+        self.background = background
+        self.enabled = enabled
+        self.present = present  # called with the changed rects instead of pushing them to the window
+        self.drawn = []  # (surface, rect) drawn last frame
+        self.full_redraw = True
+
+    def invalidate(self):
+        """redraw and push the whole screen next frame (window got exposed, etc)"""
+        self.full_redraw = True
+
+    def draw(self, items):
+        """draw a frame, returns the rects that were pushed to the window"""
+
+        # a blit only uses the rect's topleft, so the area it covers is the surface's size from there
+        items = [(surface, pygame.Rect(pygame.Rect(rect).topleft, surface.get_size())) for surface, rect in items]
+
+        if self.full_redraw or not self.enabled:
+            self.screen.fill(self.background)
+            for surface, rect in items:
+                self.screen.blit(surface, rect)
+            if self.present is not None:
+                self.present([self.screen.get_rect()])
+            else:
+                pygame.display.flip()
+            self.drawn = items
+            self.full_redraw = False
+            return [self.screen.get_rect()]
+
+        old_keys = {(surface, tuple(rect)) for surface, rect in self.drawn}
+        new_keys = {(surface, tuple(rect)) for surface, rect in items}
+        dirty = [rect for surface, rect in self.drawn if (surface, tuple(rect)) not in new_keys]
+        dirty += [rect for surface, rect in items if (surface, tuple(rect)) not in old_keys]
+        self.drawn = items
+        if not dirty:
+            return []
+
+        dirty = merge_rects(dirty)
+        for area in dirty:
+            self.screen.set_clip(area)
+            self.screen.fill(self.background)
+            for surface, rect in items:
+                if rect.colliderect(area):
+                    self.screen.blit(surface, rect)
+        self.screen.set_clip(None)
+
+        if self.present is not None:
+            self.present(dirty)
+        else:
+            pygame.display.update(dirty)
+        return dirty
@@ -0,0 +1,84 @@
+from collections import deque
+
+import numpy as np
+import speech_recognition as sr
+
+from noise_floor import SAMPLE_TYPES
+
+class VadEndpointer:
+    """
+    voice activity detection frame by frame from energy and zero crossing rate, a phrase
+    starts after start_frames speech frames in a row and ends after hangover_ms without
+    speech, instead of waiting out speech_recognition's pause_threshold
+    """
+
+    def __init__(self, sample_rate, sample_width, frame_ms=20, hangover_ms=300, start_frames=3,
+                 preroll_ms=200, threshold=300, max_zcr=0.35):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.frame_ms = frame_ms
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * sample_width
+        self.hangover_frames = max(1, round(hangover_ms / frame_ms))
+        self.start_frames = start_frames
+        self.preroll_frames = round(preroll_ms / frame_ms)
+        self.threshold = threshold  # energy, or a function returning it so it can follow the noise floor
+        self.max_zcr = max_zcr  # hiss crosses zero a lot more than voice does
+        self.reset()
+
+    def reset(self):
+        self.in_speech = False
+        self.speech_run = 0
+        self.silence_run = 0
+
+    def is_speech(self, frame):
+        samples = np.frombuffer(frame, dtype=SAMPLE_TYPES[self.sample_width]).astype(np.float64)
+        if self.sample_width == 1:
+            samples -= 128
+        energy = np.sqrt(np.mean(samples * samples))
+        threshold = self.threshold() if callable(self.threshold) else self.threshold
+        if energy <= threshold:
+            return False
+        zcr = np.count_nonzero(np.diff(np.signbit(samples))) / len(samples)
+        return zcr <= self.max_zcr
+
+    def process(self, frame):
+        """feed one frame, returns "start" or "end" when the phrase does that, else None"""
+
+        speech = self.is_speech(frame)
+        if not self.in_speech:
+            self.speech_run = self.speech_run + 1 if speech else 0
+            if self.speech_run >= self.start_frames:
+                self.in_speech = True
+                self.silence_run = 0
+                return "start"
+        else:
+            self.silence_run = 0 if speech else self.silence_run + 1
+            if self.silence_run >= self.hangover_frames:
+                self.in_speech = False
+                self.speech_run = 0
+                return "end"
+        return None
+
+def listen_vad(source, endpointer):
+    """read an opened sr.Microphone until the endpointer hears a whole phrase, returns it as sr.AudioData"""
+
+    endpointer.reset()
+    before = deque(maxlen=endpointer.preroll_frames + endpointer.start_frames)  # audio from just before the start
+    phrase = bytearray()
+    pending = b""
+    started = False
+    while True:
+        pending += source.stream.read(source.CHUNK)
+        while len(pending) >= endpointer.frame_bytes:
+            frame, pending = pending[:endpointer.frame_bytes], pending[endpointer.frame_bytes:]
+            event = endpointer.process(frame)
+            if not started:
+                before.append(frame)
+                if event == "start":
+                    started = True
+                    for f in before:
+                        phrase += f
+            else:
+                phrase += frame
+                if event == "end":
+                    return sr.AudioData(bytes(phrase), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
@@ -0,0 +1,147 @@
+import struct
+import subprocess
+import sys
+import time
+
+import pygame
+
+from dirty_rects import DirtyRenderer
+
+SHM_MAGIC = b"TOBY"
+SHM_HEADER = struct.Struct("<4sIIIII4sQd")  # magic, header size, width, height, pitch, slots, pixel format, frame number, time
+SHM_HEADER_SIZE = 64  # padded so every slot starts aligned
+
+def pixel_format(surface):
+    """
+    the surface's byte order as an ffmpeg pix_fmt, e.g. "bgra" for the usual little endian argb,
+    or "bgr0" when the 4th byte is just padding (the display surface)
+    """
+
+    names = ["0"] * surface.get_bytesize()  # channels with no mask are padding, ffmpeg calls that 0
+    for shift, mask, name in zip(surface.get_shifts(), surface.get_masks(), "rgba"):
+        if mask:
+            names[shift // 8] = name
+    order = "".join(names) if sys.byteorder == "little" else "".join(reversed(names))
+    return order
+
+class FrameExporter:
+    """
+    draws the same frames as the window onto a transparent canvas so the background can be
+    keyed out, and hands the canvas to a sink only on frames where something changed
+    """
+
+    def __init__(self, size, sink):
+        self.canvas = pygame.Surface(size, pygame.SRCALPHA, 32)
+        self.sink = sink
+        self.renderer = DirtyRenderer(self.canvas, background=(0, 0, 0, 0), present=self.present)
+        self.frames = 0
+        sink.open(self.canvas)
+
+    def draw(self, items):
+        self.renderer.draw(items)
+
+    def present(self, rects):
+        self.frames += 1
+        self.sink.send(self.canvas.get_view("0"), rects)
+
+    def close(self):
+        self.sink.close()
+
+class FfmpegSink:
+    """
+    pipes raw frames into ffmpeg, straight out of the canvas' pixel buffer, frames are
+    timestamped as they arrive so only sending changed ones still plays back at the right speed
+    """
+
+    def __init__(self, output_args):
+        self.output_args = output_args  # everything after the input, e.g. ["-c:v", "qtrle", "toby.mov"]
+        self.process = None
+
+    def open(self, canvas):
+        width, height = canvas.get_size()
+        command = [
+            "ffmpeg", "-loglevel", "error", "-y",
+            "-use_wallclock_as_timestamps", "1",
+            "-f", "rawvideo", "-pix_fmt", pixel_format(canvas), "-s", f"{width}x{height}", "-i", "-",
+            "-fps_mode", "vfr",
+        ] + self.output_args
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def send(self, view, rects):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.write(view)  # the buffer itself, no bytes() copy
+        except OSError as e:
+            print("Frame export stopped, ffmpeg went away:", e)
+            self.close()
+
+    def close(self):
+        if self.process is not None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+            self.process.wait()
+            self.process = None
+
+class SharedMemorySink:
+    """
+    a ring of frame slots in shared memory for a capture program to read, after the 64 byte
+    header (see SHM_HEADER) come the slots, frame n is in slot n % slots and the header's
+    frame number is only bumped once that slot is completely written
+    """
+
+    def __init__(self, name, slots=3):
+        self.name = name
+        self.slots = slots
+        self.memory = None
+
+    def open(self, canvas):
+        from multiprocessing import shared_memory
+
+        width, height = canvas.get_size()
+        self.pitch = canvas.get_pitch()
+        self.slot_size = self.pitch * height
+        self.format = pixel_format(canvas).encode()
+        size = SHM_HEADER_SIZE + self.slot_size * self.slots
+        try:
+            self.memory = shared_memory.SharedMemory(self.name, create=True, size=size)
+        except FileExistsError:  # left over from a crash
+            old = shared_memory.SharedMemory(self.name)
+            old.close()
+            old.unlink()
+            self.memory = shared_memory.SharedMemory(self.name, create=True, size=size)
+        self.width, self.height = width, height
+        self.frame = 0
+        self.write_header()
+
+    def write_header(self):
+        SHM_HEADER.pack_into(
+            self.memory.buf, 0, SHM_MAGIC, SHM_HEADER_SIZE, self.width, self.height, self.pitch,
+            self.slots, self.format, self.frame, time.time()
+        )
+
+    def send(self, view, rects):
+        start = SHM_HEADER_SIZE + (self.frame % self.slots) * self.slot_size
+        self.memory.buf[start:start + self.slot_size] = memoryview(view).cast("B")
+        self.frame += 1
+        self.write_header()
+
+    def close(self):
+        if self.memory is not None:
+            self.memory.close()
+            self.memory.unlink()
+            self.memory = None
+
+def read_latest_frame(memory):
+    """
+    for the reading side: (frame number, width, height, pixel format, bytes) of the newest
+    complete frame in an attached SharedMemory, or None before the first one
+    """
+
+    magic, header_size, width, height, pitch, slots, fmt, frame, _ = SHM_HEADER.unpack_from(memory.buf, 0)
+    if magic != SHM_MAGIC or frame == 0:
+        return None
+    start = header_size + ((frame - 1) % slots) * pitch * height
+    return frame, width, height, fmt.decode(), bytes(memory.buf[start:start + pitch * height])
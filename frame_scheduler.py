@@ -0,0 +1,76 @@
+import json
+from collections import deque
+
+import pygame
+
+def percentile(values, pct):
+    """nearest-rank percentile of an already sorted list"""
+
+    if not values:
+        return 0.0
+    i = min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))
+    return values[i]
+
+class FrameScheduler:
+    """
+    paces the main loop at a target fps with pygame.time.Clock, hands out the real time
+    between frames so every animation runs off the same clock, and records frame timings
+    """
+
+    def __init__(self, fps=33, max_delta=0.25, history=100000):
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.max_delta = max_delta  # seconds, so a long stall doesn't teleport everything
+        self.intervals = deque(maxlen=history)  # ms between frames, including the sleep
+        self.work_times = deque(maxlen=history)  # ms spent actually doing the frame
+        self.dropped = 0
+        self.frames = 0
+
+    def tick(self):
+        """wait out the rest of the frame, returns seconds since the last one"""
+
+        interval = self.clock.tick(self.fps)
+        self.intervals.append(interval)
+        self.work_times.append(self.clock.get_rawtime())
+        self.frames += 1
+        if interval > 1500 / self.fps:  # missed its slot by at least half a frame
+            self.dropped += 1
+        return min(interval / 1000, self.max_delta)
+
+    def resync(self):
+        """restart the frame timer after sleeping idle, so the nap isn't counted as a frame"""
+
+        self.clock.tick()
+        return 0.0
+
+    def stats(self):
+        intervals = sorted(self.intervals)
+        work_times = sorted(self.work_times)
+        return {
+            "target_fps": self.fps,
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "interval_p50_ms": percentile(intervals, 50),
+            "interval_p99_ms": percentile(intervals, 99),
+            "interval_max_ms": intervals[-1] if intervals else 0,
+            "work_p50_ms": percentile(work_times, 50),
+            "work_p99_ms": percentile(work_times, 99),
+            "work_max_ms": work_times[-1] if work_times else 0,
+        }
+
+    def report(self):
+        stats = self.stats()
+        return (
+            f"{stats['frames']} frames at {stats['target_fps']} fps target, {stats['dropped']} dropped | "
+            f"interval p50 {stats['interval_p50_ms']} ms p99 {stats['interval_p99_ms']} ms | "
+            f"work p50 {stats['work_p50_ms']} ms p99 {stats['work_p99_ms']} ms"
+        )
+
+    def dump(self, path):
+        """write the summary plus every recorded frame to a json file"""
+
+        data = self.stats()
+        data["intervals_ms"] = list(self.intervals)
+        data["work_ms"] = list(self.work_times)
+        with open(path, "w") as f:
+            json.dump(data, f)
@@ -1,232 +1,88 @@
+import startup_profile  # first, so the profile covers every import after it
 import pygame
-import speech_recognition as sr
-import pyttsx3
 import threading
+import multiprocessing
 import time
-import queue
-from pydub import AudioSegment
-import re
+from collections import OrderedDict
 import sys
 import os
-
-def get_resource_path(relative_path):
-    """
-    get the absolute path to a resource file
-    """
-    if hasattr(sys, '_MEIPASS'):
-        return os.path.join(sys._MEIPASS, relative_path)
-    return os.path.join(os.path.abspath("."), relative_path)
-
-# === CONFIG ===
-FONT_PATH = get_resource_path("fonts/DTM-Sans.otf")
-FONT_SIZE = 32
-AUDIO_DEVICE_NAME = "Toby Fox"
-TEXTBOX_WIDTH = 600
-TTS_RATE = 120  # slower TTS
-
-custom_words = {"tricky Tony": "Tricky Tony",
-                "Toby radiation Fox": "Toby \"Radiation\" Fox",
-                "Chris": "Kris",
-                "undertale": "Undertale",
-                "Delta Rune": "Deltarune", "Delta room": "Deltarune", "Delta Road": "Deltarune", "deltarune": "Deltarune",
-                "Rossi": "Ralsei", "Rosie": "Ralsei",
-                "Noel": "Noelle",
-                "Burley": "Berdley", "Berkley": "Berdley",
-                "frisk": "Frisk",
-                "Cara": "Chara",
-                "toriel": "Toriel",
-                "Sam's": "Sans",
-                "undyne": "Undyne",
-                "alphys": "Alphys", "Elvis": "Alphys",
-                "asgore": "Asgore", "the score": "Asgore",
-                "asriel": "Asriel",
-                "Lance": "Lancer",
-                "Anna": "Tenna", "Hannah": "Tenna",
-                "Mr antennas": "Mr. (Ant) Tenna's",
-                "Mr antenna": "Mr. (Ant) Tenna",
-                "TV time": "TV Time!",
-                "the roaring": "the Roaring",
-                "the night": "the Knight",
-                "the Roaring night": "the Roaring Knight", "The Roaring night": "the Roaring Knight",
-                "jackenstein": "Jackenstein", "Jack and Stein": "Jackenstein"}
+import speech_io as speech  # the settings and everything that gets lines from the mic or console to the screen
+from text_layout import TextLayout
+from dirty_rects import DirtyRenderer
+from frame_scheduler import FrameScheduler
+from asset_bundle import load_assets
+from tracing import TraceOverlay
+from frame_export import FrameExporter, FfmpegSink, SharedMemorySink
 
 # === PYGAME ===
-pygame.init()
-screen = pygame.display.set_mode((800, 600))
-pygame.display.set_caption("Toby Fox Simulator")
-font = pygame.font.Font(FONT_PATH, FONT_SIZE)
-pygame.mixer.init() # for sounds
-flip_sound = pygame.mixer.Sound(get_resource_path("sfx/flip.mp3"))
-hurt_sound = pygame.mixer.Sound(get_resource_path("sfx/hurt.mp3"))
-heal_sound = pygame.mixer.Sound(get_resource_path("sfx/heal.mp3"))
-
-# load dog images
-dog_scale = 5
-
-dog_closed = pygame.image.load(get_resource_path("img/dog_closed.png")).convert_alpha()
-dog_closed = pygame.transform.scale(
-    dog_closed, (dog_closed.get_width() * dog_scale, dog_closed.get_height() * dog_scale)
-)
-dog_closed = pygame.transform.flip(dog_closed, True, False)
-
-dog_open = pygame.image.load(get_resource_path("img/dog_open.png")).convert_alpha()
-dog_open = pygame.transform.scale(
-    dog_open, (dog_open.get_width() * dog_scale, dog_open.get_height() * dog_scale)
-)
-dog_open = pygame.transform.flip(dog_open, True, False)
-
-dog_walk_1 = pygame.image.load(get_resource_path("img/dog_walk_1.png")).convert_alpha()
-dog_walk_1 = pygame.transform.scale(
-    dog_walk_1, (dog_walk_1.get_width() * dog_scale, dog_walk_1.get_height() * dog_scale)
-)
-dog_walk_1 = pygame.transform.flip(dog_walk_1, True, False)
-
-dog_walk_2 = pygame.image.load(get_resource_path("img/dog_walk_2.png")).convert_alpha()
-dog_walk_2 = pygame.transform.scale(
-    dog_walk_2, (dog_walk_2.get_width() * dog_scale, dog_walk_2.get_height() * dog_scale)
-)
-dog_walk_2 = pygame.transform.flip(dog_walk_2, True, False)
-
-dog_state = dog_closed
-dog_rect = dog_closed.get_rect()
-dog_rect.midbottom = (400, 580)
-
-# and poisoned image
-poisoned_point = pygame.image.load(get_resource_path("img/poison_point.png")).convert_alpha()
-poisoned_point = pygame.transform.scale(
-    poisoned_point, (poisoned_point.get_width() * 2, poisoned_point.get_height() * 2)
-)
-poisoned_rect = poisoned_point.get_rect()
-poisoned_rect.midbottom = (600, 540)
+def init_pygame():
+    """open the window and load the font and dog sprites, sounds wait for load_sounds()"""
+
+    global screen, font, text_layout, renderer, assets, trace_overlay, frame_exporter
+    global dog_closed, dog_open, dog_walk_1, dog_walk_2, dog_state, dog_rect
+    global poisoned_point, poisoned_rect, walk_rect
+
+    pygame.display.init()  # not pygame.init(), that opens the audio device too
+    pygame.font.init()
+    screen = pygame.display.set_mode((800, 600))
+    pygame.display.set_caption("Toby Fox Simulator")
+    font = pygame.font.Font(speech.FONT_PATH, speech.FONT_SIZE)
+    text_layout = TextLayout(
+        font, speech.TEXTBOX_WIDTH, max_lines=speech.MAX_TEXT_LINES, overflow=speech.TEXT_OVERFLOW
+    )
+    renderer = DirtyRenderer(screen, enabled=speech.DIRTY_RECTS)
+    trace_overlay = TraceOverlay(pygame.font.Font(speech.FONT_PATH, 16)) if speech.TRACE_OVERLAY else None
+    if speech.FRAME_EXPORT == "ffmpeg":
+        frame_exporter = FrameExporter(screen.get_size(), FfmpegSink(speech.FRAME_EXPORT_FFMPEG_ARGS))
+    elif speech.FRAME_EXPORT == "shm":
+        frame_exporter = FrameExporter(screen.get_size(), SharedMemorySink(speech.FRAME_EXPORT_NAME))
+    assets = load_assets(speech.ASSET_BUNDLE_PATH, speech.get_resource_path(""))
+
+    # load dog images, already scaled and mirrored
+    dog_closed = assets.sprite("dog_closed")
+    dog_open = assets.sprite("dog_open")
+    dog_walk_1 = assets.sprite("dog_walk_1")
+    dog_walk_2 = assets.sprite("dog_walk_2")
+
+    dog_state = dog_closed
+    dog_rect = dog_closed.get_rect()
+    dog_rect.midbottom = (400, 580)
+
+    # and poisoned image
+    poisoned_point = assets.sprite("poison_point")
+    poisoned_rect = poisoned_point.get_rect()
+    poisoned_rect.midbottom = (600, 540)
+
+    walk_rect = dog_walk_1.get_rect()
+    walk_rect.midbottom = walk_start
 
 # === DOG FLIP ===
 dog_flipping = False
-flip_start_time = 0
+flip_elapsed = 0.0  # seconds into the current flip
 flip_duration = 0.7  # seconds
 flip_center_offset = -150  # how big is dog flip
+ROTATION_STEP = 2  # degrees between cached flip frames
+ROTATION_CACHE_BYTES = 32 * 1024 * 1024  # memory cap for cached flip frames
+FLIP_WARM_PER_FRAME = 6  # how many flip frames to prerender per frame until they're all cached
 
 # and other dog stuff (besides dog scale)
 poisoned = False
-speaking = False
+POISON_COLOR = (31, 192, 1)
+TINT_CACHE_SIZE = 16  # how many lazily tinted sprites to keep (poison ones are always kept)
 walk_in_timer_time = 2.5 # seconds
 walk_in_timer = walk_in_timer_time
 walk_start = (-200, 580)
-walk_rect = dog_closed.get_rect()
-walk_rect.midbottom = walk_start
 
 # === GLOBALS ===
-display_words = []
-running = True
-dog_toggle_time = 0.0
-tts_queue = queue.Queue()
-
-r = sr.Recognizer()
-r.pause_threshold = 1.5  # seconds of silence to consider end of a phrase (default 0.8)
-r.non_speaking_duration = 0  # how long to wait after last sound
-r.energy_threshold = 300  # sensitivity to noise (lower = more sensitive)
-mic = sr.Microphone()
-
-def process_text(text):
-    """Replace some words with custom words that Toby would say"""
-
-    text_lower = text
-    for phrase, replacement in sorted(custom_words.items(), key=lambda x: -len(x[0])):
-        if phrase in text_lower:
-            text_lower = text_lower.replace(phrase, replacement)
-    return text_lower
-
-def clean_text_for_tts(text):
-    """Remove parenthesis and punctuation so tts doesn't do weird pauses"""
-
-    text = re.sub(r"[()]", "", text)
-    text = text.replace(",", "").replace(".", "").replace("?", "").replace("!", "")
-    return text
-
-def recognize_speech():
-    """Listen to user, process and return their text"""
-
-    with mic as source:
-        print("Listening...")
-        r.adjust_for_ambient_noise(source, duration=0.5)
-        audio = r.listen(source, timeout=None, phrase_time_limit=None)
-    
-    print("Processing...")
-
-    audio_segment = AudioSegment(
-        data=audio.get_wav_data(),
-        sample_width=audio.sample_width,
-        frame_rate=audio.sample_rate,
-        channels=1
-    )
-    audio_segment += AudioSegment.silent(duration=1000)
-
-    # feed to recognize_google
-    audio_with_padding = sr.AudioData(
-        audio_segment.raw_data,
-        audio.sample_rate,
-        audio.sample_width
-    )
-
-    try:
-        text = r.recognize_google(audio_with_padding)
-        print(">>", text)
-
-        processed_text = process_text(text)
-        print(">> (", processed_text, ")")
-        return processed_text
-    except sr.UnknownValueError:
-        return ""
-    except sr.RequestError as e:
-        print("API Error:", e)
-        return ""
-
-def speak_and_display(text):
-    """speaks text word by word while updating display"""
-
-    global display_words, speaking
-
-    words = text.split()
-    display_words = ["*"]
-    if text == "":
-        display_words = []
-    speaking = True
-
-    engine = pyttsx3.init()
-    engine.setProperty("rate", TTS_RATE)
-
-    voices = engine.getProperty("voices")
-    for v in voices:
-        if AUDIO_DEVICE_NAME.lower() in v.name.lower():
-            engine.setProperty("voice", v.id)
-            break
-
-    def on_word(name, location, length):
-        idx = len(display_words) - 1
-        if idx < len(words):
-            display_words.append(words[idx])
-
-    engine.connect("started-word", on_word)
-    engine.say(clean_text_for_tts(text))
-    engine.runAndWait()
-
-    speaking = False
-
-def wrap_text(text, font, width):
-    """wrap text in pygame paragraph above dog"""
-
-    words = text.split()
-    lines = []
-    line = ""
-    for w in words:
-        test_line = line + (" " if line else "") + w
-        if font.size(test_line)[0] <= width:
-            line = test_line
-        else:
-            lines.append(line)
-            line = w
-    if line:
-        lines.append(line)
-    return lines
+dog_toggle_timer = 0.0  # seconds since the dog last changed frame
+tinted_sprites = {}  # (sprite, color) -> tinted sprite, built up front
+tint_cache = OrderedDict()  # same thing but for other colors, oldest gets evicted
+rotation_cache = OrderedDict()  # (sprite, tint, angle bucket) -> (rotated sprite, offset from pivot)
+rotation_cache_bytes = 0
+flip_warm_queue = []  # (sprite, tint, angle bucket) still left to prerender
+trace_overlay = None
+frame_exporter = None
+speech_ready = threading.Event()  # set once speech and the sounds are loaded, the dog may still be walking in
 
 def tint_surface(surface, tint_color):
     """Return a copy of surface where white pixels are replaced with the tint color (preserves transparency)."""
@@ -244,6 +100,30 @@ def tint_surface(surface, tint_color):
 
     return tinted
 
+def build_tint_cache():
+    """Tint every dog sprite green ahead of time so poisoning is just a lookup"""
+
+    for sprite in (dog_closed, dog_open, dog_walk_1, dog_walk_2):
+        tinted_sprites[(sprite, POISON_COLOR)] = tint_surface(sprite, POISON_COLOR)
+
+def get_tinted(surface, tint_color):
+    """Return a cached tinted copy of surface, tinting it the first time it's asked for"""
+
+    key = (surface, tuple(tint_color))
+    tinted = tinted_sprites.get(key)
+    if tinted is not None:
+        return tinted
+
+    tinted = tint_cache.get(key)
+    if tinted is None:
+        tinted = tint_surface(surface, tint_color)
+        tint_cache[key] = tinted
+        if len(tint_cache) > TINT_CACHE_SIZE:
+            tint_cache.popitem(last=False)
+    else:
+        tint_cache.move_to_end(key)
+    return tinted
+
 def rotate_image_around_pivot(image, pivot, radius, angle):
     """
     Rotates the image around a pivot point at a given radius and angle.
@@ -262,6 +142,45 @@ def rotate_image_around_pivot(image, pivot, radius, angle):
     rotated_rect = rotated_image.get_rect(center=new_center)
     return rotated_image, rotated_rect
 
+def get_flip_frame(sprite, tint_color, angle):
+    """
+    Return the rotated sprite and its center offset from the pivot for a flip angle,
+    snapped to ROTATION_STEP and cached so a flip is just a blit per frame.
+    """
+    global rotation_cache_bytes
+
+    bucket = int(round(angle / ROTATION_STEP)) % (360 // ROTATION_STEP)
+    key = (sprite, tint_color, bucket)
+    frame = rotation_cache.get(key)
+    if frame is not None:
+        rotation_cache.move_to_end(key)
+        return frame
+
+    image = sprite if tint_color is None else get_tinted(sprite, tint_color)
+    rotated_image, rotated_rect = rotate_image_around_pivot(image, (0, 0), flip_center_offset, bucket * ROTATION_STEP)
+    frame = (rotated_image, rotated_rect.center)
+
+    rotation_cache[key] = frame
+    rotation_cache_bytes += rotated_image.get_bytesize() * rotated_image.get_width() * rotated_image.get_height()
+    while rotation_cache_bytes > ROTATION_CACHE_BYTES and len(rotation_cache) > 1:
+        _, (old_image, _) = rotation_cache.popitem(last=False)
+        rotation_cache_bytes -= old_image.get_bytesize() * old_image.get_width() * old_image.get_height()
+    return frame
+
+def queue_flip_warmup():
+    """Line up every flip frame for the talking sprites so they get prerendered a few at a time"""
+
+    for sprite in (dog_closed, dog_open):
+        for bucket in range(360 // ROTATION_STEP):
+            flip_warm_queue.append((sprite, None, bucket))
+
+def warm_flip_frames(count):
+    """Prerender up to count queued flip frames"""
+
+    for _ in range(min(count, len(flip_warm_queue))):
+        sprite, tint_color, bucket = flip_warm_queue.pop()
+        get_flip_frame(sprite, tint_color, bucket * ROTATION_STEP)
+
 def ease_out_quad(t):
     """for dog walk"""
     return -t * (t - 2)
@@ -269,20 +188,19 @@ def ease_out_quad(t):
 def draw_text():
     """Draws text and dog oops"""
 
-    global dog_state, dog_flipping, flip_start_time
+    global dog_state, dog_flipping
 
-    screen.fill((0, 0, 0))
-    text_str = " ".join(display_words)
-    lines = wrap_text(text_str, font, TEXTBOX_WIDTH)
+    frame = []  # (surface, rect) in draw order
+    text_layout.sync(speech.display_words)
+    line_surfaces = text_layout.render()
 
-    total_height = len(lines) * font.get_height()
+    total_height = len(line_surfaces) * font.get_height()
     y = 400 - total_height
 
-    for line in lines:
-        text_surface = font.render(line, True, (255, 255, 255))
+    for text_surface in line_surfaces:
         rect = text_surface.get_rect()
         rect.midtop = (400, y)
-        screen.blit(text_surface, rect)
+        frame.append((text_surface, rect))
         y += font.get_height()
 
     # draw dog
@@ -290,21 +208,21 @@ def draw_text():
 
     # if poisoned, tint green
     if poisoned:
-        current_dog = tint_surface(current_dog, (31, 192, 1))
+        current_dog = get_tinted(current_dog, POISON_COLOR)
 
         # draw poisoned arrow
-        screen.blit(poisoned_point, poisoned_rect)
+        frame.append((poisoned_point, poisoned_rect))
 
     if dog_flipping:
         # calculate flip progress 0 → 1
-        elapsed = time.time() - flip_start_time
-        progress = min(elapsed / flip_duration, 1.0)
+        progress = min(flip_elapsed / flip_duration, 1.0)
         angle = 180 + (360 * progress)  # linear CCW rotation
 
         # pivot point above the dog
         pivot = (dog_rect.centerx, dog_rect.centery + flip_center_offset)
-        rotated_image, rot_rect = rotate_image_around_pivot(current_dog, pivot, flip_center_offset, angle)
-        screen.blit(rotated_image, rot_rect)
+        rotated_image, offset = get_flip_frame(dog_state, POISON_COLOR if poisoned else None, angle)
+        rot_rect = rotated_image.get_rect(center=(pivot[0] + offset[0], pivot[1] + offset[1]))
+        frame.append((rotated_image, rot_rect))
 
         # stop flip when done
         if progress >= 1.0:
@@ -314,90 +232,131 @@ def draw_text():
         eased_progress = ease_out_quad(walk_progress)
 
         walk_rect.midbottom = (walk_start[0] + (dog_rect.midbottom[0] - walk_start[0]) * eased_progress, walk_start[1] + (dog_rect.midbottom[1] - walk_start[1]) * eased_progress)
-        screen.blit(current_dog, walk_rect)
+        frame.append((current_dog, walk_rect))
     else:
-        screen.blit(current_dog, dog_rect)
-
-    pygame.display.flip()
-
-# === continuous recognition/TTS loop ===
-def main_loop():
-    while running:
-        text = recognize_speech()
-        if text.strip():
-            tts_queue.put(text.strip())
-
-def tts_worker():
-    while running:
-        try:
-            text = tts_queue.get(timeout=0.1)
-            speak_and_display(text)
-        except queue.Empty:
-            continue
-
-def console_input_loop():
-    while running:
-        try:
-            user_text = input()  # blocking call in its own thread
-            if user_text.strip():
-                tts_queue.put(user_text.strip())
-        except EOFError:
-            break
+        frame.append((current_dog, dog_rect))
 
-# === MAIN LOOP ===
-delta_time = 30 # milliseconds
-main_stuff_started = False
-dog_toggle_time = time.time()
-while running:
-    current_time = time.time()
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-    
-        elif event.type == pygame.KEYDOWN:
-            if walk_in_timer <= 0:
-                if event.key == pygame.K_z:
-                    if not speaking:
-                        # DOG. FLIP.
-                        speak_and_display("")
-                        flip_sound.play()
-                        if not poisoned:
-                            dog_flipping = True
-                            flip_start_time = time.time()
-                elif event.key == pygame.K_x:
-                    if not dog_flipping:
-                        poisoned = not poisoned
-
-                        if poisoned:
-                            hurt_sound.play()
-                        else:
-                            heal_sound.play()
-
-    if main_stuff_started:
-        # animate dog at 5 toggles/sec only while speaking
-        if speaking and current_time - dog_toggle_time > 0.1:
-            dog_state = dog_open if dog_state == dog_closed else dog_closed
-            dog_toggle_time = current_time
-        elif not speaking:
-            dog_state = dog_closed
-    else:
-        # same thing but for walking
-        if current_time - dog_toggle_time > 0.2:
-            dog_state = dog_walk_1 if dog_state == dog_walk_2 else dog_walk_2
-            dog_toggle_time = current_time
+    if trace_overlay is not None:
+        frame += trace_overlay.draw_items(speech.tracer)
 
-    draw_text()
+    renderer.draw(frame)
+    if frame_exporter is not None:
+        frame_exporter.draw(frame)
 
-    walk_in_timer = max(0, walk_in_timer - delta_time / 1000) # bite me
+def is_animating():
+    """whether the next frame could look different without anything else happening"""
+    return speech.speaking or dog_flipping or walk_in_timer > 0 or bool(flip_warm_queue) or dog_state is not dog_closed
 
-    if walk_in_timer == 0 and not main_stuff_started:
-        # start recognition/TTS loop in separate thread
-        threading.Thread(target=main_loop, daemon=True).start()
-        threading.Thread(target=tts_worker, daemon=True).start()
-        threading.Thread(target=console_input_loop, daemon=True).start()
-        main_stuff_started = True
-    
-    pygame.time.delay(delta_time)
+def load_sounds():
+    """
+    the rest of the slow startup, run by speech.load_speech() after the speech setup
+    while the dog walks in: the sound effects and the poisoned sprites
+    """
+
+    global flip_sound, hurt_sound, heal_sound
+
+    flip_sound = assets.sound("flip")
+    hurt_sound = assets.sound("hurt")
+    heal_sound = assets.sound("heal")
+    speech.startup.mark("sounds loaded")
+
+    build_tint_cache()
+    speech.startup.mark("poisoned sprites tinted")
+
+    speech_ready.set()
+    speech.notify_state_changed()
 
-pygame.quit()
+# === MAIN LOOP ===
+def main():
+    global poisoned, dog_flipping, flip_elapsed, dog_state, dog_toggle_timer, walk_in_timer
+
+    speech.startup.mark("imports done")
+    speech.open_logs(os.path.basename(__file__))
+    init_pygame()
+    speech.startup.mark("window open")
+    draw_text()
+    speech.startup.mark("first frame drawn")
+    threading.Thread(target=speech.load_speech, args=(load_sounds,), name="load_speech", daemon=True).start()
+    queue_flip_warmup()
+    scheduler = FrameScheduler(speech.TARGET_FPS)
+    main_stuff_started = False
+    while speech.running:
+        animating = is_animating()
+        events = speech.get_events(animating)
+        if speech.EVENT_DRIVEN and not animating:
+            delta_time = scheduler.resync()  # napping isn't a frame
+        else:
+            delta_time = scheduler.tick()
+
+        if dog_flipping:
+            flip_elapsed += delta_time
+
+        for event in events:
+            if event.type == pygame.QUIT:
+                speech.running = False
+            elif event.type == pygame.WINDOWEXPOSED:
+                renderer.invalidate()
+
+            elif event.type == pygame.KEYDOWN:
+                if main_stuff_started:
+                    if event.key in (pygame.K_z, pygame.K_x):
+                        speech.record("key", key=pygame.key.name(event.key))
+                    if event.key == pygame.K_z:
+                        if not speech.speaking:
+                            # DOG. FLIP.
+                            speech.speak_and_display("")
+                            flip_sound.play()
+                            if not poisoned:
+                                dog_flipping = True
+                                flip_elapsed = 0.0
+                    elif event.key == pygame.K_x:
+                        if not dog_flipping:
+                            poisoned = not poisoned
+
+                            if poisoned:
+                                hurt_sound.play()
+                            else:
+                                heal_sound.play()
+
+        dog_toggle_timer += delta_time
+        if main_stuff_started:
+            # animate dog at 5 toggles/sec only while speaking, or with the audio if lip syncing
+            mouth = speech.mouth_track  # tts thread can clear it any time
+            if speech.speaking and mouth is not None:
+                dog_state = dog_open if mouth.is_open(time.perf_counter()) else dog_closed
+            elif speech.speaking and dog_toggle_timer > 0.1:
+                dog_state = dog_open if dog_state == dog_closed else dog_closed
+                dog_toggle_timer = 0.0
+            elif not speech.speaking:
+                dog_state = dog_closed
+        else:
+            # same thing but for walking
+            if dog_toggle_timer > 0.2:
+                dog_state = dog_walk_1 if dog_state == dog_walk_2 else dog_walk_2
+                dog_toggle_timer = 0.0
+
+        draw_text()
+        warm_flip_frames(FLIP_WARM_PER_FRAME)
+
+        walk_in_timer = max(0, walk_in_timer - delta_time)
+
+        if walk_in_timer == 0 and not main_stuff_started and speech_ready.is_set():
+            speech.start_speech()
+            main_stuff_started = True
+
+    if speech.FRAME_STATS:
+        print(scheduler.report())
+        print(speech.tts_queue.report())
+    if speech.FRAME_STATS_PATH:
+        scheduler.dump(speech.FRAME_STATS_PATH)
+
+    speech.close_speech()
+    if frame_exporter is not None:
+        frame_exporter.close()
+    pygame.quit()
+    if speech.speech_error is not None:
+        sys.exit(f"Couldn't start speech: {speech.speech_error!r}")
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # the tts engine process re-runs this exe when frozen
+    main()
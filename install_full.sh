@@ -1 +1,2 @@
-pyinstaller --onefile --noconsole --icon "dog_open.ico" --distpath dist/ --add-data "img:img" --add-data "fonts:fonts" --add-data "sfx:sfx" full_radiation.py
\ No newline at end of file
+python build_assets.py
+pyinstaller --onefile --noconsole --icon "dog_open.ico" --distpath dist/ --add-data "assets.bin:." --add-data "fonts:fonts" full_radiation.py
\ No newline at end of file
@@ -1,258 +1,136 @@
+import startup_profile  # first, so the profile covers every import after it
 import pygame
-import speech_recognition as sr
-import pyttsx3
 import threading
+import multiprocessing
 import time
-import queue
-from pydub import AudioSegment
-import re
 import sys
 import os
-
-def get_resource_path(relative_path):
-    """
-    get the absolute path to a resource file
-    """
-    if hasattr(sys, '_MEIPASS'):
-        return os.path.join(sys._MEIPASS, relative_path)
-    return os.path.join(os.path.abspath("."), relative_path)
-
-# === CONFIG ===
-FONT_PATH = get_resource_path("fonts/DTM-Sans.otf")
-FONT_SIZE = 32
-AUDIO_DEVICE_NAME = "Toby Fox"
-TEXTBOX_WIDTH = 600
-TTS_RATE = 120  # slower TTS
-
-custom_words = {"tricky Tony": "Tricky Tony",
-                "Toby radiation Fox": "Toby \"Radiation\" Fox",
-                "Chris": "Kris",
-                "undertale": "Undertale",
-                "Delta Rune": "Deltarune", "Delta room": "Deltarune", "Delta Road": "Deltarune", "deltarune": "Deltarune",
-                "Rossi": "Ralsei", "Rosie": "Ralsei",
-                "Noel": "Noelle",
-                "Burley": "Berdley", "Berkley": "Berdley",
-                "frisk": "Frisk",
-                "Cara": "Chara",
-                "toriel": "Toriel",
-                "Sam's": "Sans",
-                "undyne": "Undyne",
-                "alphys": "Alphys", "Elvis": "Alphys",
-                "asgore": "Asgore", "the score": "Asgore",
-                "asriel": "Asriel",
-                "Lance": "Lancer",
-                "Anna": "Tenna", "Hannah": "Tenna",
-                "Mr antennas": "Mr. (Ant) Tenna's",
-                "Mr antenna": "Mr. (Ant) Tenna",
-                "TV time": "TV Time!",
-                "the roaring": "the Roaring",
-                "the night": "the Knight",
-                "the Roaring night": "the Roaring Knight", "The Roaring night": "the Roaring Knight",
-                "jackenstein": "Jackenstein", "Jack and Stein": "Jackenstein"}
+import speech_io as speech  # the settings and everything that gets lines from the mic or console to the screen
+from text_layout import TextLayout
+from dirty_rects import DirtyRenderer
+from frame_scheduler import FrameScheduler
+from asset_bundle import load_assets
+from tracing import TraceOverlay
+from frame_export import FrameExporter, FfmpegSink, SharedMemorySink
 
 # === PYGAME ===
-pygame.init()
-screen = pygame.display.set_mode((800, 600))
-pygame.display.set_caption("Toby Fox Simulator")
-font = pygame.font.Font(FONT_PATH, FONT_SIZE)
-
-# load dog images
-dog_scale = 5
-
-dog_closed = pygame.image.load(get_resource_path("img/dog_closed.png")).convert_alpha()
-dog_closed = pygame.transform.scale(
-    dog_closed, (dog_closed.get_width() * dog_scale, dog_closed.get_height() * dog_scale)
-)
-dog_closed = pygame.transform.flip(dog_closed, True, False)
-
-dog_open = pygame.image.load(get_resource_path("img/dog_open.png")).convert_alpha()
-dog_open = pygame.transform.scale(
-    dog_open, (dog_open.get_width() * dog_scale, dog_open.get_height() * dog_scale)
-)
-dog_open = pygame.transform.flip(dog_open, True, False)
-
-dog_state = dog_closed
-dog_rect = dog_closed.get_rect()
-dog_rect.midbottom = (400, 580)
-
-# === GLOBALS ===
-display_words = []
-running = True
-speaking = False # handles dog talking
-dog_toggle_time = 0.0
-tts_queue = queue.Queue()
-
-r = sr.Recognizer()
-r.pause_threshold = 1.5  # seconds of silence to consider end of a phrase (default 0.8)
-r.non_speaking_duration = 0  # how long to wait after last sound
-r.energy_threshold = 300  # sensitivity to noise (lower = more sensitive)
-mic = sr.Microphone()
-
-def process_text(text):
-    """Replace some words with custom words that Toby would say"""
-
-    text_lower = text
-    for phrase, replacement in sorted(custom_words.items(), key=lambda x: -len(x[0])):
-        if phrase in text_lower:
-            text_lower = text_lower.replace(phrase, replacement)
-    return text_lower
-
-def clean_text_for_tts(text):
-    """Remove parenthesis and punctuation so tts doesn't do weird pauses"""
-
-    text = re.sub(r"[()]", "", text)
-    text = text.replace(",", "").replace(".", "").replace("?", "").replace("!", "")
-    return text
-
-def recognize_speech():
-    """Listen to user, process and return their text"""
-
-    with mic as source:
-        print("Listening...")
-        r.adjust_for_ambient_noise(source, duration=0.5)
-        audio = r.listen(source, timeout=None, phrase_time_limit=None)
-    
-    print("Processing...")
-
-    audio_segment = AudioSegment(
-        data=audio.get_wav_data(),
-        sample_width=audio.sample_width,
-        frame_rate=audio.sample_rate,
-        channels=1
-    )
-    audio_segment += AudioSegment.silent(duration=1000)
-
-    # feed to recognize_google
-    audio_with_padding = sr.AudioData(
-        audio_segment.raw_data,
-        audio.sample_rate,
-        audio.sample_width
+def init_pygame():
+    """open the window and load the font and dog sprites"""
+
+    global screen, font, text_layout, renderer, trace_overlay, frame_exporter, dog_closed, dog_open, dog_state, dog_rect
+
+    pygame.display.init()  # not pygame.init(), that opens the audio device too
+    pygame.font.init()
+    screen = pygame.display.set_mode((800, 600))
+    pygame.display.set_caption("Toby Fox Simulator")
+    font = pygame.font.Font(speech.FONT_PATH, speech.FONT_SIZE)
+    text_layout = TextLayout(
+        font, speech.TEXTBOX_WIDTH, max_lines=speech.MAX_TEXT_LINES, overflow=speech.TEXT_OVERFLOW
     )
+    renderer = DirtyRenderer(screen, enabled=speech.DIRTY_RECTS)
+    trace_overlay = TraceOverlay(pygame.font.Font(speech.FONT_PATH, 16)) if speech.TRACE_OVERLAY else None
+    if speech.FRAME_EXPORT == "ffmpeg":
+        frame_exporter = FrameExporter(screen.get_size(), FfmpegSink(speech.FRAME_EXPORT_FFMPEG_ARGS))
+    elif speech.FRAME_EXPORT == "shm":
+        frame_exporter = FrameExporter(screen.get_size(), SharedMemorySink(speech.FRAME_EXPORT_NAME))
+    assets = load_assets(speech.ASSET_BUNDLE_PATH, speech.get_resource_path(""))
+
+    # load dog images, already scaled and mirrored
+    dog_closed = assets.sprite("dog_closed")
+    dog_open = assets.sprite("dog_open")
+
+    dog_state = dog_closed
+    dog_rect = dog_closed.get_rect()
+    dog_rect.midbottom = (400, 580)
 
-    try:
-        text = r.recognize_google(audio_with_padding)
-        print(">>", text)
-
-        processed_text = process_text(text)
-        print(">> (", processed_text, ")")
-        return processed_text
-    except sr.UnknownValueError:
-        return ""
-    except sr.RequestError as e:
-        print("API Error:", e)
-        return ""
-
-def speak_and_display(text):
-    """speaks text word by word while updating display"""
-
-    global display_words, speaking
-
-    words = text.split()
-    display_words = ["*"]
-    speaking = True
-
-    engine = pyttsx3.init()
-    engine.setProperty("rate", TTS_RATE)
-
-    voices = engine.getProperty("voices")
-    for v in voices:
-        if AUDIO_DEVICE_NAME.lower() in v.name.lower():
-            engine.setProperty("voice", v.id)
-            break
-
-    def on_word(name, location, length):
-        idx = len(display_words) - 1
-        if idx < len(words):
-            display_words.append(words[idx])
-
-    engine.connect("started-word", on_word)
-    engine.say(clean_text_for_tts(text))
-    engine.runAndWait()
-
-    speaking = False
-
-def wrap_text(text, font, width):
-    """wrap text in pygame paragraph above dog"""
-
-    words = text.split()
-    lines = []
-    line = ""
-    for w in words:
-        test_line = line + (" " if line else "") + w
-        if font.size(test_line)[0] <= width:
-            line = test_line
-        else:
-            lines.append(line)
-            line = w
-    if line:
-        lines.append(line)
-    return lines
+# === GLOBALS ===
+dog_toggle_timer = 0.0  # seconds since the dog last changed frame
+trace_overlay = None
+frame_exporter = None
 
 def draw_text():
     """draws text and dog oops"""
 
-    screen.fill((0, 0, 0))
-    text_str = " ".join(display_words)
-    lines = wrap_text(text_str, font, TEXTBOX_WIDTH)
+    frame = []  # (surface, rect) in draw order
+    text_layout.sync(speech.display_words)
+    line_surfaces = text_layout.render()
 
-    total_height = len(lines) * font.get_height()
+    total_height = len(line_surfaces) * font.get_height()
     y = 400 - total_height
 
-    for line in lines:
-        text_surface = font.render(line, True, (255, 255, 255))
+    for text_surface in line_surfaces:
         rect = text_surface.get_rect()
         rect.midtop = (400, y)
-        screen.blit(text_surface, rect)
+        frame.append((text_surface, rect))
         y += font.get_height()
 
     # draw dog
-    screen.blit(dog_state, dog_rect)
-    pygame.display.flip()
+    frame.append((dog_state, dog_rect))
 
-# === continuous recognition/TTS loop ===
-def main_loop():
-    while running:
-        text = recognize_speech()
-        if text.strip():
-            tts_queue.put(text.strip())
+    if trace_overlay is not None:
+        frame += trace_overlay.draw_items(speech.tracer)
 
-def tts_worker():
-    while running:
-        try:
-            text = tts_queue.get(timeout=0.1)
-            speak_and_display(text)
-        except queue.Empty:
-            continue
+    renderer.draw(frame)
+    if frame_exporter is not None:
+        frame_exporter.draw(frame)
 
-def console_input_loop():
-    while running:
-        try:
-            user_text = input()  # blocking call in its own thread
-            if user_text.strip():
-                tts_queue.put(user_text.strip())
-        except EOFError:
-            break
-
-# start recognition/TTS loop in separate thread
-threading.Thread(target=main_loop, daemon=True).start()
-threading.Thread(target=tts_worker, daemon=True).start()
-threading.Thread(target=console_input_loop, daemon=True).start()
+def is_animating():
+    """whether the next frame could look different without anything else happening"""
+    return speech.speaking or dog_state is not dog_closed
 
 # === MAIN LOOP ===
-dog_toggle_time = time.time()
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    # animate dog at 5 toggles/sec only while speaking
-    if speaking and time.time() - dog_toggle_time > 0.1:
-        dog_state = dog_open if dog_state == dog_closed else dog_closed
-        dog_toggle_time = time.time()
-    elif not speaking:
-        dog_state = dog_closed
+def main():
+    global dog_state, dog_toggle_timer
 
+    speech.startup.mark("imports done")
+    speech.open_logs(os.path.basename(__file__))
+    init_pygame()
+    speech.startup.mark("window open")
     draw_text()
-    pygame.time.delay(30)
-
-pygame.quit()
+    speech.startup.mark("first frame drawn")
+    threading.Thread(target=speech.load_speech, args=(speech.start_speech,), name="load_speech", daemon=True).start()
+
+    scheduler = FrameScheduler(speech.TARGET_FPS)
+    while speech.running:
+        animating = is_animating()
+        events = speech.get_events(animating)
+        if speech.EVENT_DRIVEN and not animating:
+            delta_time = scheduler.resync()  # napping isn't a frame
+        else:
+            delta_time = scheduler.tick()
+
+        for event in events:
+            if event.type == pygame.QUIT:
+                speech.running = False
+            elif event.type == pygame.WINDOWEXPOSED:
+                renderer.invalidate()
+
+        # animate dog at 5 toggles/sec only while speaking, or with the audio if lip syncing
+        dog_toggle_timer += delta_time
+        mouth = speech.mouth_track  # tts thread can clear it any time
+        if speech.speaking and mouth is not None:
+            dog_state = dog_open if mouth.is_open(time.perf_counter()) else dog_closed
+        elif speech.speaking and dog_toggle_timer > 0.1:
+            dog_state = dog_open if dog_state == dog_closed else dog_closed
+            dog_toggle_timer = 0.0
+        elif not speech.speaking:
+            dog_state = dog_closed
+
+        draw_text()
+
+    if speech.FRAME_STATS:
+        print(scheduler.report())
+        print(speech.tts_queue.report())
+    if speech.FRAME_STATS_PATH:
+        scheduler.dump(speech.FRAME_STATS_PATH)
+
+    speech.close_speech()
+    if frame_exporter is not None:
+        frame_exporter.close()
+    pygame.quit()
+    if speech.speech_error is not None:
+        sys.exit(f"Couldn't start speech: {speech.speech_error!r}")
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # the tts engine process re-runs this exe when frozen
+    main()
@@ -0,0 +1,58 @@
+import io
+import wave
+
+import numpy as np
+
+def rms_envelope(audio, window):
+    """
+    tts wav bytes -> (loudness of every window seconds of it, 0 to 1 of the loudest one, window length actually used)
+    all in one go with numpy, nothing left to do per frame
+    """
+
+    with wave.open(io.BytesIO(audio), "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError("expected 16 bit tts audio")
+        rate = wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        samples = samples.reshape(-1, wf.getnchannels()).mean(axis=1, dtype=np.float32)
+
+    size = max(1, int(rate * window))
+    padded = np.zeros(-(-len(samples) // size) * size, dtype=np.float32)  # round up to whole windows
+    padded[:len(samples)] = samples
+    envelope = np.sqrt(np.mean(padded.reshape(-1, size) ** 2, axis=1))
+    loudest = envelope.max() if len(envelope) else 0
+    if loudest > 0:
+        envelope /= loudest
+    return envelope, size / rate
+
+class MouthTrack:
+    """
+    whether Toby's mouth is open at each point of one line, worked out from the audio before it
+    plays, the render loop just looks up how far into the line it is
+    """
+
+    def __init__(self, audio, window=0.03, threshold=0.2, offset=0.0):
+        envelope, self.window = rms_envelope(audio, window)
+        self.open = envelope > threshold
+        self.offset = offset  # seconds, for audio that comes out of the speakers a bit late
+        self.started = None  # perf_counter() when the line started playing
+
+    def open_at(self, seconds):
+        """is the mouth open this many seconds into the line"""
+
+        i = int((seconds - self.offset) / self.window)
+        return 0 <= i < len(self.open) and bool(self.open[i])
+
+    def is_open(self, now):
+        return self.started is not None and self.open_at(now - self.started)
+
+def make_mouth_track(audio, window, threshold, offset):
+    """a MouthTrack for the line, or None if the audio isn't something it can read (then it falls back to the timer)"""
+
+    if not audio:
+        return None
+    try:
+        return MouthTrack(audio, window, threshold, offset)
+    except (wave.Error, ValueError, EOFError) as e:
+        print("Lip sync off for this line, can't read its audio:", e)
+        return None
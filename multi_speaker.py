@@ -0,0 +1,385 @@
+from startup_profile import StartupProfile  # first, so the profile covers every import after it
+import pygame
+import threading
+import multiprocessing
+import queue
+import time
+import traceback
+import io
+import sys
+import speech_io as base  # word fixes, text cleanup and every setting not overridden below
+from text_layout import Scrollback, TextLayout
+from dirty_rects import DirtyRenderer
+from frame_scheduler import FrameScheduler
+from tts_engine import TTSEngine, word_times
+from asset_bundle import load_assets, init_mixer, SpriteCache
+from tracing import Tracer
+from speech_queue import SpeechQueue
+# speech_recognition, numpy and the modules that use them get imported in load_speech(), after the window is up
+
+# === CONFIG ===
+# anything not set here (font, tts rate, recognizer, lip sync, queue sizes, ...) is taken from speech_io's CONFIG
+SPEAKERS = [
+    # voice: part of the tts voice's name ("" = the first one installed)
+    # prefix: console lines starting with it go to this speaker, lines without a known prefix go to the first one
+    # mic: None = console only, "default" or a device index (see sr.Microphone.list_microphone_names())
+    # scale: size compared to the usual dog, flipped: face the other way
+    {"name": "Toby", "voice": "Toby Fox", "prefix": "toby:", "mic": "default", "scale": 1, "flipped": False},
+    {"name": "Dog", "voice": "", "prefix": "dog:", "mic": None, "scale": 0.6, "flipped": True},
+]
+COLUMN_WIDTH = 400  # every speaker gets a column this wide, the window is as wide as they all need
+WINDOW_HEIGHT = 600
+TEXT_BOTTOM = 400  # where the bottom line of each text box sits
+DOG_BOTTOM = 580
+TRACE_PATH = None  # or a .jsonl path to log how long each stage of every utterance took
+
+startup = StartupProfile()
+
+# === PYGAME ===
+STATE_CHANGED = pygame.USEREVENT + 1  # posted by worker threads when there's something new to draw
+
+class Speaker:
+    """
+    one character on screen with everything that's a global in speech_io:
+    its voice, queues, text box, mouth and where its lines come from
+    """
+
+    def __init__(self, config, column, font, sprites):
+        self.name = config["name"]
+        self.voice = config.get("voice", "")
+        self.prefix = config.get("prefix")
+        self.mic_device = config.get("mic")
+        self.rate = config.get("rate", base.TTS_RATE)
+        self.font = font
+
+        self.display_words = []
+        self.speaking = False
+        self.mouth_track = None  # MouthTrack of the line playing right now, if lip syncing
+        self.tts_queue = SpeechQueue(base.SPEECH_QUEUE_SIZE, base.COALESCE_WORDS, base.STALE_SPEECH_SECONDS)
+        self.synth_queue = queue.Queue(maxsize=1)  # (text, audio, word events, synth seconds, trace, mouth track)
+        self.text_layout = TextLayout(
+            font, COLUMN_WIDTH - 40, max_lines=base.MAX_TEXT_LINES, overflow=base.TEXT_OVERFLOW
+        )
+        self.center_x = column * COLUMN_WIDTH + COLUMN_WIDTH // 2
+
+        # from the shared cache, speakers that look alike don't get their own copies
+        scale, flipped = config.get("scale", 1), config.get("flipped", False)
+        self.dog_closed = sprites.get("dog_closed", scale, flipped)
+        self.dog_open = sprites.get("dog_open", scale, flipped)
+        self.dog_state = self.dog_closed
+        self.dog_rect = self.dog_closed.get_rect(midbottom=(self.center_x, DOG_BOTTOM))
+        self.dog_toggle_timer = 0.0
+
+        self.tts_engine = None  # everything from here down gets set up by start() after the first frame
+        self.recognizer = None
+        self.backend = None
+        self.noise_tracker = None
+        self.mic = None
+
+    # --- speech in ---
+    def start(self, sr):
+        """open the voice and the mic (if it has one) and start its threads"""
+
+        from recognizers import make_backend
+        from noise_floor import NoiseFloorTracker
+
+        self.tts_engine = TTSEngine(self.voice, self.rate)
+        threading.Thread(target=self.synth_worker, daemon=True).start()
+        threading.Thread(target=self.tts_worker, daemon=True).start()
+
+        if self.mic_device is None:
+            return
+        self.recognizer = sr.Recognizer()
+        self.recognizer.pause_threshold = 1.5
+        self.recognizer.non_speaking_duration = 0
+        self.recognizer.energy_threshold = 300
+        self.noise_tracker = NoiseFloorTracker(self.recognizer) if base.NOISE_TRACKING else None
+        self.backend = make_backend(base.RECOGNIZER, self.recognizer, base.VOSK_MODEL_PATH, base.STUB_FIXTURES_PATH)
+        if self.backend.uses_microphone:
+            if self.mic_device == "default":
+                self.mic = sr.Microphone()
+            else:
+                self.mic = sr.Microphone(device_index=self.mic_device)
+        threading.Thread(target=self.listen_loop, daemon=True).start()
+
+    def listen_loop(self):
+        """this speaker's mic, one phrase at a time, backing off like speech_io's main_loop() while it keeps failing"""
+
+        failures = 0
+        while running:
+            trace = tracer.start("mic")
+            try:
+                text = self.hear(trace)
+            except Exception as e:
+                failures += 1
+                wait = base.retry_wait(failures)
+                print(f"{self.name}: recognition failed ({e}), trying again in {wait} s")
+                time.sleep(wait)
+                continue
+            failures = 0
+            if not text:
+                continue
+            if trace.said is None:
+                trace.said = time.perf_counter()
+            print(f"{self.name} >>", text)
+            with trace.span("process_text"):
+                processed_text = base.process_text(text)
+            self.queue_line(processed_text, trace)
+
+    def hear(self, trace):
+        """the next thing said into this speaker's mic (or its fixtures, for the stub recognizer)"""
+
+        if not self.backend.uses_microphone:
+            with trace.span("recognize"):
+                return self.backend.recognize_stream(None, self.show_partial)
+
+        with self.mic as source:
+            base.calibrate(source, self.recognizer, self.noise_tracker)
+            if self.backend.streaming:
+                with trace.span("listen_and_recognize"):
+                    return self.backend.recognize_stream(self.recognizer.listen(source, stream=True), self.show_partial)
+            # the same endpointing and padding as the single speaker scripts, with this speaker's recognizer
+            audio = base.listen(source, trace, self.recognizer)
+
+        audio = base.pad_phrase(audio, trace)
+        with trace.span("recognize"):
+            return self.backend.recognize(audio)
+
+    def show_partial(self, text):
+        if self.speaking:
+            return
+        self.display_words = Scrollback(["*"] + base.process_text(text).split(), base.SCROLLBACK_WORDS)
+        notify_state_changed()
+
+    def queue_line(self, text, trace):
+        if text.strip():
+            trace.queued = time.perf_counter()
+            typed = trace.source == "console"
+            self.tts_queue.put(
+                text.strip(), trace, priority=0 if typed and base.TYPED_FIRST else 1, can_go_stale=not typed
+            )
+
+    # --- speech out ---
+    def synth_worker(self):
+        """synthesizes this speaker's lines ahead of tts_worker, always pipelined so voices can overlap"""
+
+        from lip_sync import make_mouth_track
+
+        while running:
+            try:
+                text, trace = self.tts_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            trace.mark("tts_queue", trace.queued)
+            with trace.span("synthesize"):
+                audio, word_events, synth_seconds = self.tts_engine.synthesize(base.clean_text_for_tts(text))
+            mouth = None
+            if base.LIP_SYNC:
+                mouth = make_mouth_track(audio, base.LIP_SYNC_WINDOW, base.LIP_SYNC_THRESHOLD, base.LIP_SYNC_OFFSET)
+            trace.queued = time.perf_counter()
+            self.synth_queue.put((text, audio, word_events, synth_seconds, trace, mouth))
+            self.tts_queue.task_done()
+
+    def tts_worker(self):
+        while running:
+            try:
+                self.play_and_display(*self.synth_queue.get(timeout=0.1))
+            except queue.Empty:
+                continue
+            self.synth_queue.task_done()
+
+    def play_and_display(self, text, audio, word_events, synth_seconds, trace, mouth):
+        """plays presynthesized speech, showing each word when the audio gets to it"""
+
+        trace.mark("synth_queue", trace.queued)
+        words = text.split()
+        self.display_words = Scrollback(["*"], base.SCROLLBACK_WORDS)
+        self.speaking = True
+        notify_state_changed()
+
+        if audio:
+            sound = pygame.mixer.Sound(file=io.BytesIO(audio))
+            length = sound.get_length()
+            times = word_times(base.clean_text_for_tts(text), word_events, synth_seconds, length)
+
+            start = time.perf_counter()
+            sound.play()  # on its own mixer channel, so speakers can talk over each other
+            if mouth is not None:
+                mouth.started = start
+                self.mouth_track = mouth
+            for i, (word, seconds) in enumerate(zip(words, times)):
+                time.sleep(max(0, start + seconds - time.perf_counter()))
+                self.display_words.append(word)
+                notify_state_changed()
+                if i == 0:
+                    trace.mark("first_word", start)
+                    trace.first_word()
+            time.sleep(max(0, start + length - time.perf_counter()))
+
+        self.mouth_track = None
+        self.speaking = False
+        notify_state_changed()
+
+    # --- drawing ---
+    def animate(self, delta_time, now):
+        """same mouth rules as just_speech: the audio's loudness if lip syncing, 5 toggles/sec if not"""
+
+        self.dog_toggle_timer += delta_time
+        mouth = self.mouth_track  # tts thread can clear it any time
+        if self.speaking and mouth is not None:
+            self.dog_state = self.dog_open if mouth.is_open(now) else self.dog_closed
+        elif self.speaking and self.dog_toggle_timer > 0.1:
+            self.dog_state = self.dog_open if self.dog_state == self.dog_closed else self.dog_closed
+            self.dog_toggle_timer = 0.0
+        elif not self.speaking:
+            self.dog_state = self.dog_closed
+
+    def is_animating(self):
+        return self.speaking or self.dog_state is not self.dog_closed
+
+    def frame_items(self):
+        """this speaker's (surface, rect)s for the shared frame"""
+
+        items = []
+        self.text_layout.sync(self.display_words)
+        line_surfaces = self.text_layout.render()
+        line_height = self.font.get_height()
+        y = TEXT_BOTTOM - len(line_surfaces) * line_height
+        for text_surface in line_surfaces:
+            items.append((text_surface, text_surface.get_rect(midtop=(self.center_x, y))))
+            y += line_height
+        items.append((self.dog_state, self.dog_rect))
+        return items
+
+def init_pygame(configs=None):
+    """open a window wide enough for every speaker and make them, all sharing one font and sprite cache"""
+
+    global screen, font, renderer, sprites, speakers
+
+    configs = SPEAKERS if configs is None else configs
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((max(800, COLUMN_WIDTH * len(configs)), WINDOW_HEIGHT))
+    pygame.display.set_caption("Toby Fox Simulator")
+    font = pygame.font.Font(base.FONT_PATH, base.FONT_SIZE)
+    renderer = DirtyRenderer(screen, enabled=base.DIRTY_RECTS)
+    assets = load_assets(base.ASSET_BUNDLE_PATH, base.get_resource_path(""))
+    sprites = SpriteCache(assets)
+    speakers = [Speaker(config, i, font, sprites) for i, config in enumerate(configs)]
+
+# === GLOBALS ===
+running = True
+speakers = []
+tracer = Tracer()  # replaced in main() with one that logs to TRACE_PATH
+speech_error = None  # whatever stopped load_speech(), if anything did
+
+def notify_state_changed():
+    """wake up the render loop from any thread"""
+    pygame.event.post(pygame.event.Event(STATE_CHANGED))
+
+def draw_frame():
+    """every speaker in one frame, one pass of the dirty rect renderer"""
+
+    frame = []
+    for speaker in speakers:
+        frame += speaker.frame_items()
+    renderer.draw(frame)
+
+def route_console_line(text):
+    """"dog: woof" goes to the speaker with that prefix, anything else to the first speaker"""
+
+    lowered = text.lower()
+    for speaker in speakers:
+        if speaker.prefix and lowered.startswith(speaker.prefix.lower()):
+            return speaker, text[len(speaker.prefix):]
+    return speakers[0], text
+
+def console_input_loop():
+    while running:
+        try:
+            user_text = input()  # blocking call in its own thread
+        except EOFError:
+            break
+        speaker, text = route_console_line(user_text)
+        trace = tracer.start("console")
+        trace.said = trace.started
+        speaker.queue_line(text, trace)
+
+def load_speech():
+    """set_up_speech() on its own thread, closing the window if it fails instead of leaving it stuck"""
+
+    global speech_error
+
+    try:
+        set_up_speech()
+    except Exception as e:
+        traceback.print_exc()
+        speech_error = e
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+def set_up_speech():
+    """the mixer, speech_recognition and every speaker's voice and mic, run by load_speech() after the first frame"""
+
+    init_mixer()
+    startup.mark("mixer ready")
+
+    import speech_recognition as sr
+    startup.mark("speech modules imported")
+
+    for speaker in speakers:
+        speaker.start(sr)
+        startup.mark(f"{speaker.name} ready")
+
+    threading.Thread(target=console_input_loop, daemon=True).start()
+    if base.PROFILE_STARTUP:
+        print(startup.report())
+
+# === MAIN LOOP ===
+def main():
+    global running, tracer
+
+    startup.mark("imports done")
+    tracer = Tracer(TRACE_PATH)
+    init_pygame()
+    startup.mark("window open")
+    draw_frame()
+    startup.mark("first frame drawn")
+    threading.Thread(target=load_speech, name="load_speech", daemon=True).start()
+
+    scheduler = FrameScheduler(base.TARGET_FPS)
+    while running:
+        animating = any(speaker.is_animating() for speaker in speakers)
+        if base.EVENT_DRIVEN and not animating:
+            events = [pygame.event.wait(base.IDLE_TIMEOUT)] + pygame.event.get()
+            delta_time = scheduler.resync()  # napping isn't a frame
+        else:
+            events = pygame.event.get()
+            delta_time = scheduler.tick()
+
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.WINDOWEXPOSED:
+                renderer.invalidate()
+
+        now = time.perf_counter()
+        for speaker in speakers:
+            speaker.animate(delta_time, now)
+        draw_frame()
+
+    if base.FRAME_STATS:
+        print(scheduler.report())
+        for speaker in speakers:
+            print(f"{speaker.name}:", speaker.tts_queue.report())
+
+    for speaker in speakers:
+        if speaker.tts_engine is not None:
+            speaker.tts_engine.close()
+    tracer.close()
+    pygame.quit()
+    if speech_error is not None:
+        sys.exit(f"Couldn't start speech: {speech_error!r}")
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # the tts engine processes re-run this exe when frozen
+    main()
@@ -0,0 +1,66 @@
+from collections import deque
+
+import numpy as np
+
+SAMPLE_TYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+def chunk_energy(data, sample_width):
+    """rms of a chunk of raw pcm, same scale as speech_recognition's energy_threshold"""
+
+    samples = np.frombuffer(data, dtype=SAMPLE_TYPES[sample_width]).astype(np.float64)
+    if sample_width == 1:
+        samples -= 128  # 8 bit is unsigned
+    if samples.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(samples * samples)))
+
+class TappedStream:
+    """passes a mic stream through, showing every chunk read from it to a callback"""
+
+    def __init__(self, stream, on_chunk):
+        self.stream = stream
+        self.on_chunk = on_chunk
+
+    def read(self, size):
+        data = self.stream.read(size)
+        self.on_chunk(data)
+        return data
+
+    def close(self):
+        self.stream.close()
+
+class NoiseFloorTracker:
+    """
+    keeps a rolling estimate of the room's background noise from the audio the mic is
+    reading anyway, and keeps the recognizer's energy_threshold a bit above it
+    """
+
+    def __init__(self, recognizer, window_seconds=5.0, percentile=20, ratio=1.5, minimum=50):
+        self.recognizer = recognizer
+        self.window_seconds = window_seconds
+        self.percentile = percentile  # low enough that talking doesn't count as noise
+        self.ratio = ratio  # threshold = floor * ratio, like adjust_for_ambient_noise
+        self.minimum = minimum
+        self.energies = deque()
+        self.sample_width = 2
+        self.floor = None
+
+        recognizer.dynamic_energy_threshold = False  # we're doing it instead
+
+    def attach(self, source):
+        """start listening in on an opened sr.Microphone"""
+
+        if isinstance(source.stream, TappedStream):
+            return
+        self.sample_width = source.SAMPLE_WIDTH
+        chunks_per_window = max(1, int(self.window_seconds * source.SAMPLE_RATE / source.CHUNK))
+        if self.energies.maxlen != chunks_per_window:
+            self.energies = deque(self.energies, maxlen=chunks_per_window)
+        source.stream = TappedStream(source.stream, self.observe)
+
+    def observe(self, data):
+        self.energies.append(chunk_energy(data, self.sample_width))
+        if len(self.energies) < self.energies.maxlen // 10:
+            return  # not enough heard yet to call it the room's noise
+        self.floor = float(np.percentile(self.energies, self.percentile))
+        self.recognizer.energy_threshold = max(self.minimum, self.floor * self.ratio)
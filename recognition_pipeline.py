@@ -0,0 +1,53 @@
+import queue
+import threading
+
+class ReorderBuffer:
+    """hands results on in the order their phrases were captured, whatever order they finish in"""
+
+    def __init__(self, deliver):
+        self.deliver = deliver
+        self.pending = {}  # seq -> result that finished early
+        self.next_seq = 0
+        self.lock = threading.Lock()
+
+    def put(self, seq, result):
+        with self.lock:
+            self.pending[seq] = result
+            while self.next_seq in self.pending:
+                self.deliver(self.pending.pop(self.next_seq))
+                self.next_seq += 1
+
+class RecognitionPipeline:
+    """
+    one thread keeps capturing phrases into a bounded queue while a pool of workers
+    recognizes them in parallel, so nothing said during recognition gets lost
+
+    phrases() yields captured audio, recognize(audio) returns text and deliver(text)
+    gets every result in the order it was said (None for ones that failed)
+    """
+
+    def __init__(self, phrases, recognize, deliver, workers=2, max_pending=8):
+        self.phrases = phrases
+        self.recognize = recognize
+        self.reorder = ReorderBuffer(deliver)
+        self.workers = workers
+        self.phrase_queue = queue.Queue(maxsize=max_pending)
+
+    def start(self):
+        threading.Thread(target=self.capture_loop, daemon=True).start()
+        for _ in range(self.workers):
+            threading.Thread(target=self.worker_loop, daemon=True).start()
+
+    def capture_loop(self):
+        for seq, audio in enumerate(self.phrases()):
+            self.phrase_queue.put((seq, audio))
+
+    def worker_loop(self):
+        while True:
+            seq, audio = self.phrase_queue.get()
+            try:
+                text = self.recognize(audio)
+            except Exception as e:
+                print("Recognition failed:", e)
+                text = None
+            self.reorder.put(seq, text)
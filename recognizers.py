@@ -0,0 +1,151 @@
+import json
+import time
+from abc import ABC, abstractmethod
+
+import speech_recognition as sr
+
+def pad_with_silence(audio, milliseconds):
+    """
+    sr.AudioData with silence added to the end, made by copying the raw pcm once into a
+    buffer that's already the right size (no wav header, no pydub)
+    """
+
+    frame_data = audio.frame_data
+    padding = int(audio.sample_rate * milliseconds / 1000) * audio.sample_width
+    buffer = bytearray(len(frame_data) + padding)  # zeros are silence for signed 16/24/32 bit
+    view = memoryview(buffer)
+    view[:len(frame_data)] = frame_data
+    if audio.sample_width == 1:
+        view[len(frame_data):] = b"\x80" * padding  # 8 bit wav is unsigned
+    return sr.AudioData(buffer, audio.sample_rate, audio.sample_width)
+
+class RecognizerBackend(ABC):
+    """
+    turns a phrase of audio into text, streaming backends can also hand out
+    partial guesses while the phrase is still being said
+    """
+
+    streaming = False  # gives partial results from recognize_stream()
+    uses_microphone = True
+
+    @abstractmethod
+    def recognize(self, audio):
+        """text for a whole phrase of sr.AudioData, "" if nothing was understood"""
+
+    def recognize_stream(self, chunks, on_partial):
+        """
+        recognize a phrase arriving as sr.AudioData chunks, calling on_partial(text)
+        with the best guess so far, by default just waits for the whole thing
+        """
+
+        chunks = list(chunks)
+        if not chunks:
+            return ""
+        audio = sr.AudioData(b"".join(c.frame_data for c in chunks), chunks[0].sample_rate, chunks[0].sample_width)
+        return self.recognize(audio)
+
+class GoogleBackend(RecognizerBackend):
+    """the free google web speech api, needs internet and only answers once the phrase is over"""
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+
+    def recognize(self, audio):
+        try:
+            return self.recognizer.recognize_google(audio)
+        except sr.UnknownValueError:
+            return ""
+        except sr.RequestError as e:
+            print("API Error:", e)
+            return ""
+
+class VoskBackend(RecognizerBackend):
+    """offline recognition with vosk (pip install vosk, plus a model from alphacephei.com/vosk/models)"""
+
+    streaming = True
+
+    def __init__(self, model_path):
+        import vosk
+
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(model_path)
+
+    def recognize(self, audio):
+        recognizer = self.vosk.KaldiRecognizer(self.model, audio.sample_rate)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_width=2))
+        return json.loads(recognizer.FinalResult())["text"]
+
+    def recognize_stream(self, chunks, on_partial):
+        recognizer = None
+        done = []  # text vosk has already committed to
+        for chunk in chunks:
+            if recognizer is None:
+                recognizer = self.vosk.KaldiRecognizer(self.model, chunk.sample_rate)
+
+            if recognizer.AcceptWaveform(chunk.get_raw_data(convert_width=2)):
+                done.append(json.loads(recognizer.Result())["text"])
+                partial = ""
+            else:
+                partial = json.loads(recognizer.PartialResult())["partial"]
+            guess = " ".join(t for t in done + [partial] if t)
+            if guess:
+                on_partial(guess)
+
+        if recognizer is None:
+            return ""
+        done.append(json.loads(recognizer.FinalResult())["text"])
+        return " ".join(t for t in done if t)
+
+class StubBackend(RecognizerBackend):
+    """
+    doesn't listen at all, "hears" the phrases in a fixture file instead, either a json list of
+    {"text": ..., "partials": [...], "seconds": how long it takes to say, "delay": pause before it}
+    or plain text with one phrase per line
+    """
+
+    streaming = True
+    uses_microphone = False
+
+    def __init__(self, fixture_path):
+        with open(fixture_path, encoding="utf-8") as f:
+            if fixture_path.endswith(".json"):
+                self.phrases = json.load(f)
+            else:
+                self.phrases = [{"text": line.strip()} for line in f if line.strip()]
+
+    def next_phrase(self):
+        if not self.phrases:
+            time.sleep(1)  # out of fixtures, nobody's talking anymore
+            return None
+        return self.phrases.pop(0)
+
+    def recognize(self, audio):
+        phrase = self.next_phrase()
+        return phrase["text"] if phrase else ""
+
+    def recognize_stream(self, chunks, on_partial):
+        phrase = self.next_phrase()
+        if phrase is None:
+            return ""
+
+        words = phrase["text"].split()
+        partials = phrase.get("partials") or [" ".join(words[:i]) for i in range(1, len(words))]
+        time.sleep(phrase.get("delay", 1.0))
+        step = phrase.get("seconds", 0.3 * len(words)) / (len(partials) + 1)
+        for partial in partials:
+            time.sleep(step)
+            on_partial(partial)
+        time.sleep(step)
+        return phrase["text"]
+
+def make_backend(name, recognizer, vosk_model_path=None, fixture_path=None):
+    """pick a backend by its config name"""
+
+    if name == "google":
+        return GoogleBackend(recognizer)
+    if name == "vosk":
+        return VoskBackend(vosk_model_path)
+    if name == "stub":
+        return StubBackend(fixture_path)
+    raise ValueError(f"unknown recognizer {name!r}, pick google, vosk or stub")
@@ -0,0 +1,287 @@
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # nothing on screen, nothing out the speakers
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from lip_sync import make_mouth_track
+from text_layout import Scrollback
+from tts_engine import TTSEngine, word_times
+
+LINE_GAP = 0.3  # seconds between lines, about what the live pipelined tts leaves
+MOUTH_TOGGLE = 0.1  # same as the live loop, when it isn't lip syncing
+WALK_TOGGLE = 0.2
+
+def parse_script(path):
+    """
+    one thing per line: text for Toby to say, Z (flip) or X (poison), "wait 1.5" for a pause,
+    blank lines and # comments are skipped
+    """
+
+    actions = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.upper() in ("Z", "X"):
+                actions.append(("key", line.upper()))
+            elif line.lower().startswith("wait "):
+                try:
+                    actions.append(("wait", float(line[5:])))
+                except ValueError:
+                    actions.append(("say", line))  # just a line that starts with "wait"
+            else:
+                actions.append(("say", line))
+    return actions
+
+def decode_wav(audio, rate, channels):
+    """tts wav bytes -> float32 samples at the mixer's rate and channel count"""
+
+    import numpy as np
+
+    with wave.open(io.BytesIO(audio), "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError("expected 16 bit tts audio")
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).astype(np.float32)
+        samples = samples.reshape(-1, wf.getnchannels()).mean(axis=1)
+        source_rate = wf.getframerate()
+    if source_rate != rate:
+        length = int(len(samples) * rate / source_rate)
+        samples = np.interp(np.arange(length) * source_rate / rate, np.arange(len(samples)), samples)
+    return np.repeat(samples[:, None], channels, axis=1).astype(np.float32)
+
+def build_timeline(game, actions, tts_engine, walk_in):
+    """
+    synthesize every line and lay everything out in time, returns (events, total seconds)
+    where events are ("say", start, words, word times, length, wav bytes, mouth track or None), ("z", start, flips) and ("x", start)
+    """
+
+    events = []
+    t = game.walk_in_timer_time if walk_in else 0.0
+    speaking_until = 0.0
+    poisoned = False
+    for kind, value in actions:
+        if kind == "wait":
+            t += value
+        elif kind == "say":
+            clean = game.speech.clean_text_for_tts(value)
+            audio, word_events, synth_seconds = tts_engine.synthesize(clean)
+            with wave.open(io.BytesIO(audio), "rb") as wf:
+                length = wf.getnframes() / wf.getframerate()
+            times = word_times(clean, word_events, synth_seconds, length)
+            mouth = None
+            if game.speech.LIP_SYNC:
+                mouth = make_mouth_track(  # no speaker delay in a file
+                    audio, game.speech.LIP_SYNC_WINDOW, game.speech.LIP_SYNC_THRESHOLD, 0.0
+                )
+            events.append(("say", t, value.split(), times, length, audio, mouth))
+            speaking_until = t + length
+            t += length + LINE_GAP
+        elif value == "Z":
+            t = max(t, speaking_until)  # z does nothing while toby's talking
+            events.append(("z", t, not poisoned))
+            if not poisoned:
+                t += game.flip_duration
+        else:
+            events.append(("x", t))
+            poisoned = not poisoned
+            t += 0.3
+    return events, t + 0.5
+
+def mix_audio(game, events, total, path):
+    """every line and sound effect into one wav, at the mixer's rate"""
+
+    import numpy as np
+    import pygame
+
+    from asset_bundle import init_mixer
+
+    init_mixer()  # needed to decode the sound effects, nothing is played (SDL_AUDIODRIVER is dummy)
+    rate, size, channels = pygame.mixer.get_init()
+    track = np.zeros((int(total * rate) + 1, channels), dtype=np.float32)
+    sfx = {
+        name: np.frombuffer(game.assets.sound(name).get_raw(), dtype=np.int16)
+        .reshape(-1, channels).astype(np.float32)
+        for name in ("flip", "hurt", "heal")
+    }
+
+    def add(samples, start):
+        i = int(start * rate)
+        n = min(len(samples), len(track) - i)
+        track[i:i + n] += samples[:n]
+
+    poisoned = False
+    for event in events:
+        if event[0] == "say":
+            add(decode_wav(event[5], rate, channels), event[1])
+        elif event[0] == "z":
+            add(sfx["flip"], event[1])
+        else:
+            poisoned = not poisoned
+            add(sfx["hurt" if poisoned else "heal"], event[1])
+
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(abs(size) // 8)
+        wf.setframerate(rate)
+        wf.writeframes(np.clip(track, -32768, 32767).astype(np.int16).tobytes())
+
+def render_frames(game, events, total, fps, walk_in, out):
+    """drive draw_text() one frame at a time from the timeline, writing every frame to out"""
+
+    frames = int(total * fps)
+    timeline = sorted(events, key=lambda e: e[1])
+    next_event = 0
+    say = None
+    shown = 0  # words of say already in display_words
+    flip_start = None
+    game.speech.display_words = []
+    game.poisoned = False
+    for n in range(frames):
+        t = n / fps
+        while next_event < len(timeline) and timeline[next_event][1] <= t:
+            event = timeline[next_event]
+            next_event += 1
+            if event[0] == "say":
+                say = event
+                shown = 0
+                game.speech.display_words = Scrollback(["*"], game.speech.SCROLLBACK_WORDS)
+            elif event[0] == "z":
+                game.speech.display_words = []  # same as speak_and_display("")
+                say = None
+                if event[2]:
+                    flip_start = event[1]
+            else:
+                game.poisoned = not game.poisoned
+
+        game.speech.speaking = say is not None and t < say[1] + say[4]
+        if say is not None:
+            # same list all line long, only appended to, so the layout only wraps and renders what's new
+            revealed = len(say[2])
+            if game.speech.speaking:
+                revealed = sum(1 for seconds in say[3] if say[1] + seconds <= t)
+            for word in say[2][shown:revealed]:
+                game.speech.display_words.append(word)
+            shown = max(shown, revealed)
+            if not game.speech.speaking:
+                say = None
+
+        game.dog_flipping = flip_start is not None and t < flip_start + game.flip_duration
+        game.flip_elapsed = t - flip_start if game.dog_flipping else 0.0
+        if not game.dog_flipping:
+            flip_start = None
+
+        game.walk_in_timer = max(0.0, game.walk_in_timer_time - t) if walk_in else 0
+        if game.walk_in_timer > 0:
+            game.dog_state = game.dog_walk_2 if int(t / WALK_TOGGLE) % 2 == 0 else game.dog_walk_1
+        elif game.speech.speaking and say[6] is not None:
+            game.dog_state = game.dog_open if say[6].open_at(t - say[1]) else game.dog_closed
+        elif game.speech.speaking:
+            game.dog_state = game.dog_open if int((t - say[1]) / MOUTH_TOGGLE) % 2 else game.dog_closed
+        else:
+            game.dog_state = game.dog_closed
+
+        game.draw_text()
+        out.write(game.screen.get_view("0"))
+    return frames
+
+def render(script_path, out_path, fps, walk_in, ffmpeg_args):
+    """render one script to a video, runs in its own process"""
+
+    import full_radiation as game
+    from frame_export import pixel_format
+
+    started = time.perf_counter()
+    game.init_pygame()
+    tts_engine = TTSEngine(game.speech.AUDIO_DEVICE_NAME, game.speech.TTS_RATE)
+    try:
+        events, total = build_timeline(game, parse_script(script_path), tts_engine, walk_in)
+    finally:
+        tts_engine.close()
+
+    fd, audio_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        mix_audio(game, events, total, audio_path)
+        width, height = game.screen.get_size()
+        command = [
+            "ffmpeg", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", pixel_format(game.screen), "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+            "-i", audio_path,
+        ] + ffmpeg_args + [out_path]
+        process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        try:
+            frames = render_frames(game, events, total, fps, walk_in, process.stdin)
+        finally:
+            process.stdin.close()
+            process.wait()
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed on {out_path} ({process.returncode})")
+    finally:
+        os.remove(audio_path)
+
+    import pygame
+
+    pygame.quit()
+    return out_path, frames, total, time.perf_counter() - started
+
+def check_assets():
+    """fail once up here instead of in every worker if assets.bin was never built"""
+
+    from asset_bundle import load_assets
+    from speech_io import ASSET_BUNDLE_PATH, get_resource_path
+
+    load_assets(ASSET_BUNDLE_PATH, get_resource_path(""))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="render script files of lines and Z/X presses to video without opening the window, "
+                    "faster than real time and several at once (needs ffmpeg)"
+    )
+    parser.add_argument("scripts", nargs="+", help="text files, one line to say, Z, X or \"wait <seconds>\" per line")
+    parser.add_argument("--out-dir", default="renders")
+    parser.add_argument("--fps", type=int, default=33)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="scripts rendered at once")
+    parser.add_argument("--no-walk-in", action="store_true", help="start with the dog already in place")
+    parser.add_argument("--ext", default="mp4", help="output container")
+    parser.add_argument("--ffmpeg-args", nargs=argparse.REMAINDER,
+                        default=["-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest"],
+                        help="ffmpeg output options, must come last")
+    args = parser.parse_args()
+
+    out_paths = {}
+    for script in args.scripts:
+        name = os.path.splitext(os.path.basename(script))[0]
+        out_path = os.path.join(args.out_dir, f"{name}.{args.ext}")
+        if out_path in out_paths:
+            parser.error(f"{out_paths[out_path]} and {script} would both render to {out_path}, rename one")
+        out_paths[out_path] = script
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    check_assets()
+
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {}
+        for out_path, script in out_paths.items():
+            futures[pool.submit(render, script, out_path, args.fps, not args.no_walk_in, args.ffmpeg_args)] = script
+        failed = 0
+        for future in as_completed(futures):
+            try:
+                out_path, frames, seconds, took = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"{futures[future]}: failed, {e}")
+                continue
+            print(f"{out_path}: {frames} frames, {seconds:.1f} s of video in {took:.1f} s ({seconds / took:.1f}x real time)")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
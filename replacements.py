@@ -0,0 +1,70 @@
+import json
+import re
+
+def load_words(path):
+    """
+    load a replacement dictionary from a file, either a json object or
+    "phrase = replacement" lines (blank lines and lines starting with # are skipped)
+    """
+
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+
+        words = {}
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or " = " not in line:
+                continue
+            phrase, replacement = line.split(" = ", 1)
+            words[phrase.strip()] = replacement.strip()
+        return words
+
+def trie_pattern(phrases):
+    """build a regex out of a trie of phrases, so thousands of them cost about as much as a few"""
+
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = True  # a phrase ends here
+    return node_pattern(trie)
+
+def node_pattern(node):
+    branches = [re.escape(ch) + node_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        pattern = "(?:" + pattern + ")?"  # greedy, so the longest phrase wins
+    return pattern
+
+class Replacer:
+    """
+    swaps every phrase of a dictionary for its replacement in one pass over the text,
+    the longest phrase wins and text that was already replaced is never looked at again
+    """
+
+    def __init__(self, words, whole_words=True, ignore_case=False):
+        self.ignore_case = ignore_case
+        self.table = {}
+        for phrase, replacement in words.items():
+            if phrase:
+                self.table.setdefault(phrase.lower() if ignore_case else phrase, replacement)
+
+        self.regex = None
+        if self.table:
+            pattern = trie_pattern(self.table)
+            if whole_words:
+                pattern = r"(?<!\w)" + pattern + r"(?!\w)"
+            self.regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+
+    def lookup(self, match):
+        found = match.group(0)
+        return self.table[found.lower() if self.ignore_case else found]
+
+    def replace(self, text):
+        if self.regex is None:
+            return text
+        return self.regex.sub(self.lookup, text)
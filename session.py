@@ -0,0 +1,74 @@
+import base64
+import json
+import threading
+import time
+
+class SessionRecorder:
+    """
+    appends everything that happens in a session to a json lines file as it happens,
+    so a crash still leaves everything up to it on disk
+    """
+
+    def __init__(self, path, **info):
+        self.path = path
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8")
+        self.record("session", wall_time=time.time(), **info)
+
+    def record(self, kind, **fields):
+        line = json.dumps({"t": round(time.perf_counter() - self.started, 4), "kind": kind, **fields})
+        with self.lock:
+            if self.file:
+                self.file.write(line + "\n")
+                self.file.flush()
+
+    def record_audio(self, audio, **fields):
+        """a captured sr.AudioData, base64'd raw pcm"""
+
+        self.record(
+            "phrase",
+            audio=base64.b64encode(audio.get_raw_data()).decode("ascii"),
+            sample_rate=audio.sample_rate,
+            sample_width=audio.sample_width,
+            **fields,
+        )
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+def decode_audio(record):
+    """(raw pcm, sample rate, sample width) of a "phrase" record"""
+
+    return base64.b64decode(record["audio"]), record["sample_rate"], record["sample_width"]
+
+class SessionReplay:
+    """
+    reads a recorded session back a line at a time, handing each record over when it happened
+    divided by speed (2 = twice as fast, 0 = no waiting at all)
+    """
+
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.speed = speed
+
+    def records(self, should_continue=lambda: True):
+        start = time.perf_counter()
+        offset = None  # the first session in the file might not start at 0, and a file can hold several
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not should_continue():
+                    return
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record["kind"] == "session":
+                    offset = None  # the next session's clock starts over
+                if offset is None:
+                    offset = record["t"] - (time.perf_counter() - start) * self.speed
+                if self.speed > 0:
+                    time.sleep(max(0, start + (record["t"] - offset) / self.speed - time.perf_counter()))
+                yield record
@@ -0,0 +1,552 @@
+from startup_profile import StartupProfile
+import pygame
+import threading
+import queue
+import time
+import traceback
+import io
+import re
+import sys
+import os
+from text_layout import Scrollback
+from replacements import Replacer, load_words
+from tts_engine import TTSEngine, word_times
+from recognition_pipeline import RecognitionPipeline
+from asset_bundle import init_mixer
+from tracing import Tracer
+from session import SessionRecorder, SessionReplay, decode_audio
+from speech_queue import SpeechQueue
+# everything full_radiation.py and just_speech.py share: the settings, the word fixes and getting lines from
+# the mic or console to the tts voice and the screen, the scripts just draw display_words and the dog
+# speech_recognition, numpy and the modules that use them get imported in set_up_speech(), after the window is up
+
+def get_resource_path(relative_path):
+    """
+    get the absolute path to a resource file
+    """
+    if hasattr(sys, '_MEIPASS'):
+        return os.path.join(sys._MEIPASS, relative_path)
+    return os.path.join(os.path.abspath("."), relative_path)
+
+# === CONFIG ===
+FONT_PATH = get_resource_path("fonts/DTM-Sans.otf")
+ASSET_BUNDLE_PATH = get_resource_path("assets.bin")  # prebaked sprites and sounds, see build_assets.py
+FONT_SIZE = 32
+AUDIO_DEVICE_NAME = "Toby Fox"
+TEXTBOX_WIDTH = 600
+MAX_TEXT_LINES = 6  # lines on screen at once, None = no limit
+TEXT_OVERFLOW = "scroll"  # past MAX_TEXT_LINES, "scroll" drops the top line, "page" starts over with the newest one
+SCROLLBACK_WORDS = 200  # words kept for the text box, older ones are forgotten (keep it above what MAX_TEXT_LINES fits)
+TTS_RATE = 120  # slower TTS
+DIRTY_RECTS = True  # only push the parts of the window that changed
+EVENT_DRIVEN = True  # sleep until something changes instead of redrawing every 30 ms
+IDLE_TIMEOUT = 1000  # longest the loop sleeps when nothing is going on (ms)
+TARGET_FPS = 33
+FRAME_STATS = True  # print frame time stats on exit
+FRAME_STATS_PATH = None  # or a .json path to dump every frame time to on exit
+FRAME_EXPORT = None  # "ffmpeg" pipes changed frames (with alpha) into ffmpeg, "shm" writes them to a shared memory ring
+FRAME_EXPORT_FFMPEG_ARGS = ["-c:v", "qtrle", "toby.mov"]  # ffmpeg output options, qtrle keeps the alpha channel
+FRAME_EXPORT_NAME = "toby_frames"  # shared memory name for "shm", see frame_export.read_latest_frame()
+CUSTOM_WORDS_PATH = "custom_words.txt"  # more "phrase = replacement" lines (or a .json), loaded if it exists
+WHOLE_WORDS = True  # only replace phrases that aren't part of a bigger word
+IGNORE_CASE = False
+PIPELINED_TTS = True  # synthesize the next line while the current one plays
+LIP_SYNC = True  # open the mouth when the speech is loud instead of every 0.1 s (needs PIPELINED_TTS)
+LIP_SYNC_WINDOW = 0.03  # seconds of audio per mouth open/closed
+LIP_SYNC_THRESHOLD = 0.2  # how loud counts as open, compared to the loudest part of the line
+LIP_SYNC_OFFSET = 0.0  # seconds, raise it if the mouth moves before the sound comes out
+RECOGNIZER = "google"  # "google", "vosk" (offline, shows words while you talk) or "stub" (reads STUB_FIXTURES_PATH)
+VOSK_MODEL_PATH = "vosk-model"
+STUB_FIXTURES_PATH = "fixtures/phrases.json"
+ENDPOINTING = "vad"  # "vad" ends a phrase after VAD_HANGOVER_MS of no voice, "pause" uses pause_threshold below
+VAD_HANGOVER_MS = 400
+PHRASE_PADDING_MS = 1000  # silence added to the end of each phrase before recognizing it in "pause" mode
+VAD_PADDING_MS = 0  # same but in "vad" mode, the hangover is already silence
+RECOGNITION_WORKERS = 2  # phrases recognized at once while the mic keeps listening (0 = one at a time)
+PHRASE_QUEUE_SIZE = 8  # captured phrases allowed to wait for a worker
+NOISE_TRACKING = True  # follow the room's noise level all the time instead of calibrating for 0.5 s before every phrase
+MIC_RETRY_SECONDS = 30  # longest to wait before trying the mic again after it keeps failing
+SPEECH_QUEUE_SIZE = 8  # lines allowed to wait to be said, when it's full the oldest recognized one gets dropped
+COALESCE_WORDS = 12  # merge lines still waiting while together they're this many words or fewer (0 = never)
+STALE_SPEECH_SECONDS = 30  # skip recognized lines that waited longer than this (None = never), typed ones never go stale
+TYPED_FIRST = True  # lines typed in the console jump ahead of recognized speech
+PROFILE_STARTUP = False  # print how long each step of startup took once everything's loaded
+TRACE_PATH = None  # or a .jsonl path to log how long each stage of every utterance took
+TRACE_OVERLAY = False  # show the latest utterance's stage latencies in the corner
+RECORD_SESSION_PATH = None  # or a .jsonl path to append the session to (phrase audio, text, keys) for replaying later
+REPLAY_SESSION_PATH = None  # a recorded session to play back instead of listening to the mic and console
+REPLAY_SPEED = 1.0  # 2 = twice as fast, 0 = as fast as it goes
+REPLAY_AUDIO = False  # recognize the recorded audio again with RECOGNIZER instead of reusing the recorded text
+REPLAY_EXIT = True  # quit once the replay is over and everything in it has been said
+
+startup = StartupProfile()
+
+custom_words = {"tricky Tony": "Tricky Tony",
+                "Toby radiation Fox": "Toby \"Radiation\" Fox",
+                "Chris": "Kris",
+                "undertale": "Undertale",
+                "Delta Rune": "Deltarune", "Delta room": "Deltarune", "Delta Road": "Deltarune", "deltarune": "Deltarune",
+                "Rossi": "Ralsei", "Rosie": "Ralsei",
+                "Noel": "Noelle",
+                "Burley": "Berdley", "Berkley": "Berdley",
+                "frisk": "Frisk",
+                "Cara": "Chara",
+                "toriel": "Toriel",
+                "Sam's": "Sans",
+                "undyne": "Undyne",
+                "alphys": "Alphys", "Elvis": "Alphys",
+                "asgore": "Asgore", "the score": "Asgore",
+                "asriel": "Asriel",
+                "Lance": "Lancer",
+                "Anna": "Tenna", "Hannah": "Tenna",
+                "Mr antennas": "Mr. (Ant) Tenna's",
+                "Mr antenna": "Mr. (Ant) Tenna",
+                "TV time": "TV Time!",
+                "the roaring": "the Roaring",
+                "the night": "the Knight",
+                "the Roaring night": "the Roaring Knight", "The Roaring night": "the Roaring Knight",
+                "jackenstein": "Jackenstein", "Jack and Stein": "Jackenstein"}
+if os.path.exists(CUSTOM_WORDS_PATH):
+    custom_words.update(load_words(CUSTOM_WORDS_PATH))
+replacer = Replacer(custom_words, whole_words=WHOLE_WORDS, ignore_case=IGNORE_CASE)
+
+STATE_CHANGED = pygame.USEREVENT + 1  # posted by worker threads when there's something new to draw
+
+# === GLOBALS ===
+display_words = []  # what the scripts draw in the text box
+running = True  # the scripts set it to False when the window closes
+speaking = False # handles dog talking
+tts_queue = SpeechQueue(SPEECH_QUEUE_SIZE, COALESCE_WORDS, STALE_SPEECH_SECONDS)  # (text, trace) waiting to be said
+synth_queue = queue.Queue(maxsize=1)  # (text, audio, word events, synth seconds, trace, mouth track) ready to play
+mouth_track = None  # MouthTrack of the line playing right now, if lip syncing
+
+r = None  # everything from here down gets set up by load_speech() after the first frame
+mic = None
+recognizer_backend = None
+noise_tracker = None
+tts_engine = None
+tracer = Tracer()  # replaced by open_logs() with one that logs to TRACE_PATH
+recorder = None  # made by open_logs() if RECORD_SESSION_PATH is set
+speech_error = None  # whatever stopped load_speech(), if anything did
+
+def process_text(text):
+    """Replace some words with custom words that Toby would say"""
+
+    return replacer.replace(text)
+
+def clean_text_for_tts(text):
+    """Remove parenthesis and punctuation so tts doesn't do weird pauses"""
+
+    text = re.sub(r"[()]", "", text)
+    text = text.replace(",", "").replace(".", "").replace("?", "").replace("!", "")
+    return text
+
+def recognize_speech():
+    """Listen to user, process and return their text and its trace"""
+
+    trace = tracer.start("mic")
+    if not recognizer_backend.uses_microphone:
+        with trace.span("recognize"):
+            text = recognizer_backend.recognize_stream(None, show_partial)
+        trace.said = time.perf_counter()
+    elif recognizer_backend.streaming:
+        with mic as source:
+            print("Listening...")
+            calibrate(source)
+            with trace.span("listen_and_recognize"):
+                text = recognizer_backend.recognize_stream(r.listen(source, stream=True), show_partial)
+            trace.said = time.perf_counter()  # it's recognized as it's heard, so the end of listening is as close as it gets
+    else:
+        with mic as source:
+            print("Listening...")
+            calibrate(source)
+            audio = listen(source, trace)
+        return recognize_phrase(audio, trace)
+
+    if not text:
+        return "", trace
+    print(">>", text)
+    record("recognized", text=text, trace=trace.id)
+
+    with trace.span("process_text"):
+        processed_text = process_text(text)
+    print(">> (", processed_text, ")")
+    record("processed", text=processed_text, trace=trace.id)
+    return processed_text, trace
+
+def calibrate(source, recognizer=None, tracker=None):
+    """get the energy threshold right before listening for a phrase, with r and noise_tracker unless given others"""
+
+    if recognizer is None:
+        recognizer, tracker = r, noise_tracker
+    if tracker is not None:
+        tracker.attach(source)  # only does anything once per open, then keeps it right with no dead time
+    else:
+        recognizer.adjust_for_ambient_noise(source, duration=0.5)
+
+def listen(source, trace, recognizer=None):
+    """wait for the next phrase on an opened mic, with r unless given another recognizer"""
+
+    recognizer = recognizer or r
+    start = time.perf_counter()
+    audio = capture_phrase(source, recognizer)
+    end = time.perf_counter()
+
+    # the phrase ended with this much silence the endpointer had to sit through, so that's when the user stopped talking
+    trailing_silence = VAD_HANGOVER_MS / 1000 if ENDPOINTING == "vad" else recognizer.pause_threshold
+    trace.said = max(start, end - trailing_silence)
+    trace.mark("listen", start, trace.said)
+    trace.mark("endpoint", trace.said, end)
+    if recorder is not None:
+        recorder.record_audio(audio, trace=trace.id)
+    return audio
+
+def capture_phrase(source, recognizer):
+    if ENDPOINTING == "vad":
+        from endpointing import VadEndpointer, listen_vad
+
+        endpointer = VadEndpointer(
+            source.SAMPLE_RATE, source.SAMPLE_WIDTH, hangover_ms=VAD_HANGOVER_MS,
+            threshold=lambda: recognizer.energy_threshold
+        )
+        return listen_vad(source, endpointer)
+    return recognizer.listen(source, timeout=None, phrase_time_limit=None)
+
+def retry_wait(failures):
+    """how long to wait before trying the mic again after failures in a row, 1, 2, 4... s up to MIC_RETRY_SECONDS"""
+
+    return min(MIC_RETRY_SECONDS, 2 ** (failures - 1))
+
+def listen_for_phrases():
+    """yields every phrase the mic hears, keeping it open in between so nothing gets missed"""
+
+    failures = 0
+    while running:
+        try:
+            with mic as source:
+                while running:
+                    print("Listening...")
+                    trace = tracer.start("mic")
+                    calibrate(source)
+                    audio = listen(source, trace)
+                    failures = 0
+                    yield audio, trace
+        except Exception as e:
+            failures += 1
+            wait = retry_wait(failures)
+            print(f"Mic failed ({e}), trying again in {wait} s")
+            time.sleep(wait)
+
+def pad_phrase(audio, trace):
+    """add the silence some recognizers need after a phrase, PHRASE_PADDING_MS or VAD_PADDING_MS of it"""
+
+    padding = VAD_PADDING_MS if ENDPOINTING == "vad" else PHRASE_PADDING_MS
+    if padding > 0:
+        from recognizers import pad_with_silence
+
+        with trace.span("pad"):
+            audio = pad_with_silence(audio, padding)
+    return audio
+
+def recognize_phrase(audio, trace):
+    """pad, recognize and process one captured phrase, returns the text and its trace"""
+
+    print("Processing...")
+
+    audio = pad_phrase(audio, trace)
+    with trace.span("recognize"):
+        text = recognizer_backend.recognize(audio)
+    if not text:
+        return "", trace
+    print(">>", text)
+    record("recognized", text=text, trace=trace.id)
+
+    with trace.span("process_text"):
+        processed_text = process_text(text)
+    print(">> (", processed_text, ")")
+    record("processed", text=processed_text, trace=trace.id)
+    return processed_text, trace
+
+def show_partial(text):
+    """show what's been heard so far while the user is still talking"""
+
+    global display_words
+
+    if speaking:
+        return
+    display_words = Scrollback(["*"] + process_text(text).split(), SCROLLBACK_WORDS)
+    notify_state_changed()
+
+def record(kind, **fields):
+    """add to the session recording, if there is one"""
+
+    if recorder is not None:
+        recorder.record(kind, **fields)
+
+def notify_state_changed():
+    """wake up the render loop from any thread"""
+    pygame.event.post(pygame.event.Event(STATE_CHANGED))
+
+def speak_and_display(text, trace=None):
+    """speaks text word by word while updating display"""
+
+    global display_words, speaking
+
+    words = text.split()
+    display_words = Scrollback(["*"], SCROLLBACK_WORDS)
+    if text == "":
+        display_words = []
+    speaking = True
+    notify_state_changed()
+
+    shown = 0  # not len(display_words), that stops growing once the scrollback is full
+
+    def on_word(location, length):
+        nonlocal shown
+        if shown < len(words):
+            display_words.append(words[shown])
+            shown += 1
+            notify_state_changed()
+            if shown == 1 and trace is not None:
+                trace.mark("first_word", start)
+                trace.first_word()
+
+    start = time.perf_counter()
+    if words:
+        tts_engine.speak(clean_text_for_tts(text), on_word)
+
+    speaking = False
+    notify_state_changed()
+
+def play_and_display(text, audio, word_events, synth_seconds, trace=None, mouth=None):
+    """plays presynthesized speech, showing each word when the audio gets to it"""
+
+    global display_words, speaking, mouth_track
+
+    if trace is not None:
+        trace.mark("synth_queue", trace.queued)
+
+    words = text.split()
+    display_words = Scrollback(["*"], SCROLLBACK_WORDS)
+    speaking = True
+    notify_state_changed()
+
+    if audio:
+        sound = pygame.mixer.Sound(file=io.BytesIO(audio))
+        length = sound.get_length()
+        times = word_times(clean_text_for_tts(text), word_events, synth_seconds, length)
+
+        start = time.perf_counter()
+        sound.play()
+        if mouth is not None:
+            mouth.started = start
+            mouth_track = mouth
+        for i, (word, seconds) in enumerate(zip(words, times)):
+            time.sleep(max(0, start + seconds - time.perf_counter()))
+            display_words.append(word)
+            notify_state_changed()
+            if i == 0 and trace is not None:
+                trace.mark("first_word", start)
+                trace.first_word()
+        time.sleep(max(0, start + length - time.perf_counter()))
+
+    mouth_track = None
+    speaking = False
+    notify_state_changed()
+
+def get_events(animating):
+    """get pending events, sleeping until one shows up if nothing is animating"""
+
+    if EVENT_DRIVEN and not animating:
+        event = pygame.event.wait(IDLE_TIMEOUT)
+        return [event] + pygame.event.get()
+    return pygame.event.get()
+
+# === continuous recognition/TTS loop ===
+def main_loop():
+    failures = 0
+    while running:
+        try:
+            text, trace = recognize_speech()
+        except Exception as e:
+            failures += 1
+            wait = retry_wait(failures)
+            print(f"Recognition failed ({e}), trying again in {wait} s")
+            time.sleep(wait)
+            continue
+        failures = 0
+        queue_recognized(text, trace)
+
+def queue_recognized(text, trace):
+    if text.strip():
+        record("queued", text=text.strip(), source=trace.source, trace=trace.id)
+        trace.queued = time.perf_counter()
+        typed = trace.source == "console"
+        tts_queue.put(text.strip(), trace, priority=0 if typed and TYPED_FIRST else 1, can_go_stale=not typed)
+
+def deliver_recognized(result):
+    """pipeline results are (text, trace), or None when recognizing failed"""
+
+    if result is not None:
+        queue_recognized(*result)
+
+def recognize_captured(phrase):
+    return recognize_phrase(*phrase)
+
+def start_recognition():
+    """capture and recognize in parallel when the backend allows it, else the plain serial loop"""
+
+    if recognizer_backend.streaming or RECOGNITION_WORKERS < 1:
+        threading.Thread(target=main_loop, daemon=True).start()
+    else:
+        RecognitionPipeline(
+            listen_for_phrases, recognize_captured, deliver_recognized, RECOGNITION_WORKERS, PHRASE_QUEUE_SIZE
+        ).start()
+
+def tts_worker():
+    while running:
+        try:
+            if PIPELINED_TTS:
+                play_and_display(*synth_queue.get(timeout=0.1))
+                synth_queue.task_done()
+            else:
+                text, trace = tts_queue.get(timeout=0.1)
+                trace.mark("tts_queue", trace.queued)
+                speak_and_display(text, trace)
+                tts_queue.task_done()
+        except queue.Empty:
+            continue
+
+def synth_worker():
+    """synthesizes queued lines ahead of tts_worker so there's no gap between them"""
+
+    from lip_sync import make_mouth_track
+
+    while running:
+        try:
+            text, trace = tts_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        trace.mark("tts_queue", trace.queued)
+        with trace.span("synthesize"):
+            audio, word_events, synth_seconds = tts_engine.synthesize(clean_text_for_tts(text))
+        mouth = make_mouth_track(audio, LIP_SYNC_WINDOW, LIP_SYNC_THRESHOLD, LIP_SYNC_OFFSET) if LIP_SYNC else None
+        trace.queued = time.perf_counter()
+        synth_queue.put((text, audio, word_events, synth_seconds, trace, mouth))
+        tts_queue.task_done()
+
+def replay_loop():
+    """plays a recorded session back through the same queues the mic, console and keyboard use"""
+
+    for rec in SessionReplay(REPLAY_SESSION_PATH, REPLAY_SPEED).records(lambda: running):
+        if rec["kind"] == "key":
+            if rec["key"] not in ("z", "x"):
+                continue  # only Z and X do anything, older recordings have every key in them
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.key.key_code(rec["key"])))
+        elif rec["kind"] == "phrase" and REPLAY_AUDIO:
+            import speech_recognition as sr
+
+            trace = tracer.start("replay")
+            trace.said = trace.started
+            queue_recognized(*recognize_phrase(sr.AudioData(*decode_audio(rec)), trace))
+        elif rec["kind"] == "queued" and not (REPLAY_AUDIO and rec["source"] == "mic"):
+            trace = tracer.start("replay")
+            trace.said = trace.started
+            queue_recognized(rec["text"], trace)
+    print("Replay finished")
+
+    if REPLAY_EXIT:
+        tts_queue.join()  # workers mark lines done once they've been said
+        synth_queue.join()
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+def console_input_loop():
+    while running:
+        try:
+            user_text = input()  # blocking call in its own thread
+            trace = tracer.start("console")
+            trace.said = trace.started
+            queue_recognized(user_text, trace)
+        except EOFError:
+            break
+
+def set_up_speech():
+    """
+    the slow half of startup, run by load_speech() so the window doesn't wait for it:
+    the mixer, speech_recognition, the mic and the tts engine
+    """
+
+    global r, mic, recognizer_backend, noise_tracker, tts_engine
+
+    init_mixer() # for presynthesized speech
+    startup.mark("mixer ready")
+
+    import speech_recognition as sr
+    from recognizers import make_backend
+    from noise_floor import NoiseFloorTracker
+    startup.mark("speech modules imported")
+
+    r = sr.Recognizer()
+    r.pause_threshold = 1.5  # seconds of silence to consider end of a phrase (default 0.8)
+    r.non_speaking_duration = 0  # how long to wait after last sound
+    r.energy_threshold = 300  # sensitivity to noise (lower = more sensitive)
+    noise_tracker = NoiseFloorTracker(r) if NOISE_TRACKING else None
+    recognizer_backend = make_backend(RECOGNIZER, r, VOSK_MODEL_PATH, STUB_FIXTURES_PATH)
+    startup.mark("recognizer ready")
+    if recognizer_backend.uses_microphone and not REPLAY_SESSION_PATH:
+        mic = sr.Microphone()
+        startup.mark("microphone ready")
+
+    tts_engine = TTSEngine(AUDIO_DEVICE_NAME, TTS_RATE)
+    startup.mark("tts engine started")
+
+def start_speech():
+    """start saying queued lines and listening to the mic and console (or the replay), once set_up_speech() is done"""
+
+    # start recognition/TTS loop in separate thread
+    threading.Thread(target=tts_worker, daemon=True).start()
+    if PIPELINED_TTS:
+        threading.Thread(target=synth_worker, daemon=True).start()
+    if REPLAY_SESSION_PATH:
+        threading.Thread(target=replay_loop, daemon=True).start()
+    else:
+        start_recognition()
+        threading.Thread(target=console_input_loop, daemon=True).start()
+
+def load_speech(*more_steps):
+    """
+    set_up_speech() and then more_steps on their own thread,
+    closing the window if any of it fails instead of leaving it stuck
+    """
+
+    global speech_error
+
+    try:
+        set_up_speech()
+        for step in more_steps:
+            step()
+    except Exception as e:
+        traceback.print_exc()
+        speech_error = e
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+        return
+    if PROFILE_STARTUP:
+        print(startup.report())
+
+def open_logs(script):
+    """the tracer and session recorder, before anything gets a chance to log to them"""
+
+    global tracer, recorder
+
+    tracer = Tracer(TRACE_PATH, notify_state_changed if TRACE_OVERLAY else None)
+    if RECORD_SESSION_PATH:
+        recorder = SessionRecorder(RECORD_SESSION_PATH, script=script, recognizer=RECOGNIZER)
+
+def close_speech():
+    """stop the tts engine and flush the logs, after the window loop is over"""
+
+    if tts_engine is not None:
+        tts_engine.close()
+    tracer.close()
+    if recorder is not None:
+        recorder.close()
@@ -0,0 +1,168 @@
+import queue
+import threading
+import time
+from collections import deque
+
+from frame_scheduler import percentile
+
+class SpeechItem:
+    def __init__(self, text, trace, priority, can_go_stale):
+        self.text = text
+        self.trace = trace
+        self.priority = priority
+        self.can_go_stale = can_go_stale
+        self.queued = time.perf_counter()
+
+class SpeechQueue:
+    """
+    the lines waiting for Toby to say them: lower priority numbers go first, short lines still
+    waiting get merged into one, recognized lines that waited too long get skipped and when it's
+    full the oldest recognized line makes room (typed lines wait for room instead, and a recognized
+    line that finds it full of typed ones is dropped rather than blocking the recognizer)
+
+    put(text, trace) and get() -> (text, trace) otherwise work like queue.Queue, task_done() and join() included
+    """
+
+    def __init__(self, maxsize=8, coalesce_words=0, stale_after=None, history=10000):
+        self.maxsize = maxsize
+        self.coalesce_words = coalesce_words
+        self.stale_after = stale_after  # seconds, None = never
+        self.lanes = {}  # priority -> deque of SpeechItem
+        self.depth = 0
+        self.unfinished = 0
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full = threading.Condition(self.lock)
+        self.all_done = threading.Condition(self.lock)
+
+        # metrics
+        self.waits = deque(maxlen=history)  # ms each line waited before get() took it
+        self.max_depth = 0
+        self.puts = 0
+        self.merged = 0
+        self.dropped_stale = 0
+        self.dropped_full = 0
+
+    def put(self, text, trace, priority=1, can_go_stale=True):
+        with self.lock:
+            self.puts += 1
+            lane = self.lanes.setdefault(priority, deque())
+            if self.coalesce_words and lane:
+                tail = lane[-1]
+                # a typed line merged into a recognized one would become droppable, so only like with like
+                if tail.can_go_stale == can_go_stale and len(tail.text.split()) + len(text.split()) <= self.coalesce_words:
+                    tail.text += " " + text  # keeps the older line's trace and queue time
+                    self.merged += 1
+                    return
+
+            while self.depth >= self.maxsize:
+                if self.drop_oldest_stale_candidate():
+                    continue
+                if can_go_stale:
+                    # full of typed lines, the recognizer never waits so this one goes instead
+                    self.dropped_full += 1
+                    print("Speech queue full, dropped:", text)
+                    return
+                self.not_full.wait()  # only someone typing waits for room
+
+            lane.append(SpeechItem(text, trace, priority, can_go_stale))
+            self.depth += 1
+            self.unfinished += 1
+            self.max_depth = max(self.max_depth, self.depth)
+            self.not_empty.notify()
+
+    def drop_oldest_stale_candidate(self):
+        """make room by dropping the oldest droppable line from the lowest priority lane that has one"""
+
+        for priority in sorted(self.lanes, reverse=True):
+            lane = self.lanes[priority]
+            for item in lane:
+                if item.can_go_stale:
+                    lane.remove(item)
+                    self.discard(item)
+                    self.dropped_full += 1
+                    print("Speech queue full, dropped:", item.text)
+                    return True
+        return False
+
+    def discard(self, item):
+        self.depth -= 1
+        self.unfinished -= 1
+        self.not_full.notify()
+        if self.unfinished == 0:
+            self.all_done.notify_all()
+
+    def get(self, timeout=None):
+        """the next line to say as (text, trace), raises queue.Empty after timeout seconds without one"""
+
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self.lock:
+            while True:
+                item = self.pop_next()
+                if item is not None:
+                    return item.text, item.trace
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self.not_empty.wait(remaining)
+
+    def pop_next(self):
+        now = time.perf_counter()
+        for priority in sorted(self.lanes):
+            lane = self.lanes[priority]
+            while lane:
+                item = lane.popleft()
+                waited = now - item.queued
+                if item.can_go_stale and self.stale_after is not None and waited > self.stale_after:
+                    self.discard(item)
+                    self.dropped_stale += 1
+                    print("Skipped stale line:", item.text)
+                    continue
+                self.depth -= 1
+                self.not_full.notify()
+                self.waits.append(waited * 1000)
+                return item
+        return None
+
+    def task_done(self):
+        with self.lock:
+            self.unfinished -= 1
+            if self.unfinished == 0:
+                self.all_done.notify_all()
+
+    def join(self):
+        with self.lock:
+            while self.unfinished:
+                self.all_done.wait()
+
+    def empty(self):
+        with self.lock:
+            return self.depth == 0
+
+    def qsize(self):
+        with self.lock:
+            return self.depth
+
+    def stats(self):
+        with self.lock:
+            waits = sorted(self.waits)
+            return {
+                "depth": self.depth,
+                "max_depth": self.max_depth,
+                "puts": self.puts,
+                "taken": len(self.waits),
+                "merged": self.merged,
+                "dropped_stale": self.dropped_stale,
+                "dropped_full": self.dropped_full,
+                "wait_p50_ms": round(percentile(waits, 50), 1),
+                "wait_p99_ms": round(percentile(waits, 99), 1),
+                "wait_max_ms": round(waits[-1], 1) if waits else 0,
+            }
+
+    def report(self):
+        stats = self.stats()
+        return (
+            f"speech queue: {stats['puts']} lines in, max depth {stats['max_depth']}, {stats['merged']} merged, "
+            f"{stats['dropped_stale']} stale and {stats['dropped_full']} overflow dropped | "
+            f"wait p50 {stats['wait_p50_ms']} ms p99 {stats['wait_p99_ms']} ms max {stats['wait_max_ms']} ms"
+        )
@@ -0,0 +1,26 @@
+import threading
+import time
+
+STARTED = time.perf_counter()  # import this first so everything after it gets timed
+
+class StartupProfile:
+    """timestamps for each step of startup, to see where the time before the window goes"""
+
+    def __init__(self):
+        self.marks = []  # (seconds since STARTED, thread name, step)
+        self.lock = threading.Lock()
+
+    def mark(self, step):
+        with self.lock:
+            self.marks.append((time.perf_counter() - STARTED, threading.current_thread().name, step))
+
+    def report(self):
+        """one line per step with the time since startup and since the last step on the same thread"""
+
+        lines = ["startup profile (ms since start, +ms since that thread's last step):"]
+        last = {}
+        for seconds, thread, step in self.marks:
+            delta = seconds - last.get(thread, 0.0)
+            last[thread] = seconds
+            lines.append(f"{seconds * 1000:9.1f}  +{delta * 1000:8.1f}  {thread:<14} {step}")
+        return "\n".join(lines)
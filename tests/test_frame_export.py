@@ -0,0 +1,39 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+
+from frame_export import pixel_format
+
+def read_pixel(data, fmt):
+    """(r, g, b, a) of the first pixel of raw bytes the way ffmpeg would read them as fmt, a is 255 with no alpha"""
+
+    values = dict(zip(fmt, data[:len(fmt)]))
+    return values["r"], values["g"], values["b"], values.get("a", 255)
+
+@pytest.fixture(scope="module")
+def display():
+    pygame.display.init()
+    screen = pygame.display.set_mode((4, 4))
+    yield screen
+    pygame.quit()
+
+def test_white_round_trips_through_the_display_surface(display):
+    display.fill((255, 255, 255))
+    fmt = pixel_format(display)
+    if display.get_bytesize() == 4 and not display.get_masks()[3]:
+        assert "0" in fmt and "a" not in fmt  # padding byte, not alpha
+    assert read_pixel(bytes(display.get_view("0")), fmt) == (255, 255, 255, 255)
+
+@pytest.mark.parametrize("flags", [pygame.SRCALPHA, 0])
+def test_white_round_trips(display, flags):
+    surface = pygame.Surface((2, 2), flags, 32)
+    surface.fill((255, 255, 255, 255))
+    assert read_pixel(bytes(surface.get_view("0")), pixel_format(surface)) == (255, 255, 255, 255)
+
+def test_colors_land_in_the_right_channels(display):
+    surface = pygame.Surface((1, 1), pygame.SRCALPHA, 32)
+    surface.fill((10, 20, 30, 40))
+    assert read_pixel(bytes(surface.get_view("0")), pixel_format(surface)) == (10, 20, 30, 40)
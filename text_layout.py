@@ -0,0 +1,108 @@
+import threading
+
+class Scrollback(list):
+    """a word list that forgets its oldest words past maxlen, keeping count of how many it dropped"""
+
+    def __init__(self, words=(), maxlen=None):
+        super().__init__(words)
+        self.maxlen = maxlen
+        self.dropped = 0
+        self.lock = threading.Lock()  # so since() never sees a trim half done
+        self.trim()
+
+    def append(self, word):
+        with self.lock:
+            super().append(word)
+            self.trim()
+
+    def trim(self):
+        """call with the lock held (or before anyone else can see the list)"""
+
+        if self.maxlen is not None and len(self) > self.maxlen:
+            extra = len(self) - self.maxlen
+            del self[:extra]
+            self.dropped += extra
+
+    def since(self, count):
+        """(the words appended after the first count that are still here, how many were ever appended)"""
+
+        with self.lock:
+            return self[max(0, count - self.dropped):], self.dropped + len(self)
+
+class TextLayout:
+    """
+    word wrapped paragraph that grows a word at a time, only measuring the last line
+    and keeping rendered lines around until their text changes
+
+    past max_lines the oldest line scrolls off the top ("scroll") or the page starts over
+    with just the newest line ("page"), either way what's gone isn't kept or rendered
+    """
+
+    def __init__(self, font, width, color=(255, 255, 255), max_lines=None, overflow="scroll"):
+        self.font = font
+        self.width = width
+        self.color = color
+        self.max_lines = max_lines
+        self.overflow = overflow
+        self.lines = []  # text of each wrapped line
+        self.surfaces = []  # rendered line, None until it needs drawing again
+        self.words = None  # word list being followed by sync()
+        self.word_count = 0
+
+    def clear(self):
+        self.lines = []
+        self.surfaces = []
+        self.words = None
+        self.word_count = 0
+
+    def append(self, word):
+        """add a word to the end of the paragraph"""
+
+        if self.lines:
+            test_line = self.lines[-1] + " " + word
+            if self.font.size(test_line)[0] <= self.width:
+                self.lines[-1] = test_line
+                self.surfaces[-1] = None
+                return
+        self.lines.append(word)
+        self.surfaces.append(None)
+        if self.max_lines is not None and len(self.lines) > self.max_lines:
+            keep = 1 if self.overflow == "page" else self.max_lines
+            del self.lines[:-keep]
+            del self.surfaces[:-keep]
+
+    def sync(self, words):
+        """
+        catch up with a word list that is only ever appended to or swapped for a new list,
+        returns True if the layout changed
+        """
+
+        changed = False
+        if words is not self.words:
+            changed = bool(self.lines)
+            self.clear()
+            self.words = words
+
+        # the total comes from the same locked read as the words, so a trim halfway done can't make it look smaller
+        if isinstance(words, Scrollback):
+            new_words, total = words.since(self.word_count)  # only what's still held, if it fell behind
+        else:
+            new_words, total = words[self.word_count:], len(words)
+        if total < self.word_count:  # a plain list that got shorter, start over
+            changed = True
+            self.clear()
+            self.words = words
+            new_words = words
+
+        for word in new_words:
+            self.append(word)
+        self.word_count = total
+        return changed or bool(new_words)
+
+    def render(self):
+        """return a surface for each line, rendering only the ones that changed"""
+
+        for i, surface in enumerate(self.surfaces):
+            if surface is None:
+                self.surfaces[i] = self.font.render(self.lines[i], True, self.color)
+        return self.surfaces
@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+EPOCH_OFFSET = time.time() - time.perf_counter()  # perf_counter -> unix time for the log
+
+class Trace:
+    """the stages of one utterance, from the mic (or console) to Toby's first word"""
+
+    def __init__(self, tracer, source):
+        self.tracer = tracer
+        self.id = uuid.uuid4().hex[:8]
+        self.source = source  # "mic" or "console"
+        self.started = time.perf_counter()
+        self.said = None  # when the user stopped talking (or hit enter), what the total is measured from
+        self.queued = None  # when it was last put on a queue, for how long it waited there
+
+    @contextmanager
+    def span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(stage, start)
+
+    def mark(self, stage, start, end=None):
+        """record a stage that ran from start to end (perf_counter seconds, end defaults to now)"""
+
+        self.tracer.record(self, stage, start, time.perf_counter() if end is None else end)
+
+    def first_word(self):
+        """Toby's first word is on screen, that's the end of the trace"""
+
+        now = time.perf_counter()
+        self.mark("total", self.said if self.said is not None else self.started, now)
+
+class Tracer:
+    """
+    hands out a Trace per utterance and writes every span as a json line to path,
+    also keeps the latest ms per stage around for the debug overlay
+    """
+
+    def __init__(self, path=None, on_change=None):
+        self.path = path
+        self.on_change = on_change  # called after every span, e.g. to redraw the overlay
+        self.latest = OrderedDict()  # stage -> ms, from the most recent trace that got that far
+        self.latest_id = None
+        self.version = 0
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8") if path else None
+
+    def start(self, source):
+        return Trace(self, source)
+
+    def record(self, trace, stage, start, end):
+        ms = (end - start) * 1000
+        with self.lock:
+            if trace.id != self.latest_id:
+                self.latest.clear()
+                self.latest_id = trace.id
+            self.latest[stage] = ms
+            self.version += 1
+            if self.file:
+                self.file.write(json.dumps({
+                    "trace": trace.id,
+                    "source": trace.source,
+                    "stage": stage,
+                    "start": round(start + EPOCH_OFFSET, 4),
+                    "ms": round(ms, 2),
+                }) + "\n")
+                self.file.flush()
+        if self.on_change:
+            self.on_change()
+
+    def snapshot(self):
+        with self.lock:
+            return self.version, self.latest_id, list(self.latest.items())
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+class TraceOverlay:
+    """renders the latest stage latencies in a corner, only re-rendering when they change"""
+
+    def __init__(self, font, topleft=(8, 8), color=(255, 255, 0)):
+        self.font = font
+        self.topleft = topleft
+        self.color = color
+        self.version = None
+        self.items = []
+
+    def draw_items(self, tracer):
+        """(surface, rect) for every line, for the renderer's frame list"""
+
+        version, trace_id, stages = tracer.snapshot()
+        if version != self.version:
+            self.version = version
+            lines = [f"trace {trace_id}"] if trace_id else ["no traces yet"]
+            lines += [f"{stage} {ms:.0f} ms" for stage, ms in stages]
+            self.items = []
+            x, y = self.topleft
+            for line in lines:
+                surface = self.font.render(line, True, self.color)
+                self.items.append((surface, surface.get_rect(topleft=(x, y))))
+                y += self.font.get_height()
+        return self.items
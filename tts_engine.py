@@ -0,0 +1,152 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+def engine_process(conn, voice_name, rate):
+    """
+    runs in its own process for the whole session: sets up one pyttsx3 engine,
+    finds the voice once, then speaks whatever comes down the pipe
+    """
+
+    import pyttsx3
+
+    engine = pyttsx3.init()
+    engine.setProperty("rate", rate)
+
+    voices = engine.getProperty("voices")
+    for v in voices:
+        if voice_name.lower() in v.name.lower():
+            engine.setProperty("voice", v.id)
+            break
+
+    recorded_words = None  # filled in instead of sent while synthesizing to a file
+    synth_start = 0.0
+
+    def on_word(name, location, length):
+        if recorded_words is not None:
+            recorded_words.append((location, length, time.perf_counter() - synth_start))
+        else:
+            conn.send(("word", name, location, length))
+
+    engine.connect("started-word", on_word)
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message[0] == "quit":
+            break
+
+        command, utterance_id, text = message
+        if command == "say":
+            engine.say(text, utterance_id)
+            engine.runAndWait()
+            conn.send(("done", utterance_id))
+        elif command == "synth":
+            fd, path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            recorded_words = []
+            synth_start = time.perf_counter()
+            engine.save_to_file(text, path, utterance_id)
+            engine.runAndWait()
+            synth_seconds = time.perf_counter() - synth_start
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.remove(path)
+            conn.send(("audio", utterance_id, audio, recorded_words, synth_seconds))
+            recorded_words = None
+
+def word_times(text, word_events, synth_seconds, audio_seconds):
+    """
+    guess when each word of the synthesized text starts in its audio: stretch the timestamps
+    recorded during synthesis to the length of the audio if there's one per word and they're
+    spread out enough to mean anything, otherwise go by how far into the text each word is
+    """
+
+    words = text.split()
+    if len(word_events) >= len(words) and synth_seconds > 0 and word_events and word_events[-1][2] > synth_seconds / 2:
+        scale = audio_seconds / synth_seconds
+        return [seconds * scale for _, _, seconds in word_events]
+
+    times = []
+    location = 0
+    for word in words:
+        location = text.index(word, location)
+        times.append(audio_seconds * location / max(len(text), 1))
+        location += len(word)
+    return times
+
+class TTSEngine:
+    """
+    a long-lived pyttsx3 engine living in a subprocess, so synthesis doesn't fight
+    the render loop for the GIL and nothing gets set up again per utterance
+    """
+
+    def __init__(self, voice_name, rate):
+        self.voice_name = voice_name
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.next_id = 0
+        self.conn = None
+        self.process = None
+        self.start()
+
+    def start(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=engine_process, args=(child_conn, self.voice_name, self.rate), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def speak(self, text, on_word=None):
+        """speak text and block until it's done, calling on_word(location, length) as each word starts"""
+
+        with self.lock:
+            self.next_id += 1
+            utterance_id = str(self.next_id)
+            try:
+                self.conn.send(("say", utterance_id, text))
+                while True:
+                    message = self.conn.recv()
+                    if message[1] != utterance_id:
+                        continue  # left over from an utterance that got cut off
+                    if message[0] == "done":
+                        return
+                    if on_word is not None:
+                        on_word(message[2], message[3])
+            except (EOFError, OSError) as e:
+                print("TTS engine died, restarting:", e)
+                self.process.join(timeout=1)
+                self.start()
+
+    def synthesize(self, text):
+        """
+        render text to audio without playing it, returns (audio file bytes, word events, seconds it took)
+        where each word event is (location, length, seconds into synthesis)
+        """
+
+        with self.lock:
+            self.next_id += 1
+            utterance_id = str(self.next_id)
+            try:
+                self.conn.send(("synth", utterance_id, text))
+                while True:
+                    message = self.conn.recv()
+                    if message[0] == "audio" and message[1] == utterance_id:
+                        return message[2], message[3], message[4]
+            except (EOFError, OSError) as e:
+                print("TTS engine died, restarting:", e)
+                self.process.join(timeout=1)
+                self.start()
+                return b"", [], 0.0
+
+    def close(self):
+        try:
+            self.conn.send(("quit",))
+        except OSError:
+            pass
+        self.process.join(timeout=1)
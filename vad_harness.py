@@ -0,0 +1,143 @@
+import argparse
+import glob
+import json
+import os
+import wave
+
+import numpy as np
+
+from endpointing import VadEndpointer
+
+def run_endpointer(frames_bytes, sample_rate, sample_width, hangover_ms, threshold):
+    """run the endpointer over a whole recording, returns [(start seconds, end seconds)] of every phrase it found"""
+
+    endpointer = VadEndpointer(sample_rate, sample_width, hangover_ms=hangover_ms, threshold=threshold)
+    frame_seconds = endpointer.frame_ms / 1000
+    phrases = []
+    start = None
+    for i in range(len(frames_bytes) // endpointer.frame_bytes):
+        frame = frames_bytes[i * endpointer.frame_bytes:(i + 1) * endpointer.frame_bytes]
+        event = endpointer.process(frame)
+        if event == "start":
+            start = (i + 1 - endpointer.start_frames) * frame_seconds
+        elif event == "end":
+            phrases.append((start, (i + 1) * frame_seconds))
+            start = None
+    return phrases
+
+def score(phrases, utterances, tolerance):
+    """
+    endpoint latency is how long after an utterance really ended its phrase got cut,
+    a false cut-off is a phrase that ended while its utterance was still going
+    """
+
+    latencies = []
+    false_cutoffs = 0
+    for start, end in utterances:
+        ends = [e for s, e in phrases if s < end and e > start]
+        false_cutoffs += sum(1 for e in ends if e < end - tolerance)
+        finals = [e for e in ends if e >= end - tolerance]
+        if finals:
+            latencies.append(min(finals) - end)
+    return latencies, false_cutoffs
+
+def load_fixture(path):
+    with wave.open(path, "rb") as wf:
+        if wf.getnchannels() != 1:
+            raise ValueError(f"{path} needs to be mono")
+        data = wf.readframes(wf.getnframes())
+        sample_rate, sample_width = wf.getframerate(), wf.getsampwidth()
+    with open(os.path.splitext(path)[0] + ".json") as f:
+        utterances = json.load(f)["utterances"]
+    return data, sample_rate, sample_width, utterances
+
+def write_synthetic(directory, count=5, sample_rate=16000, seed=0):
+    """
+    make fixtures without recording anything: room noise with voice-ish harmonic bursts for
+    syllables, short gaps inside utterances and long ones between them
+    """
+
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    for n in range(count):
+        pieces = [rng.normal(0, 60, int(sample_rate * 1.0))]
+        t = 1.0
+        utterances = []
+        for _ in range(rng.integers(2, 5)):
+            start = t
+            for _ in range(rng.integers(3, 12)):
+                length = rng.uniform(0.12, 0.35)
+                time = np.arange(int(sample_rate * length)) / sample_rate
+                pitch = rng.uniform(100, 250)
+                voice = sum(np.sin(2 * np.pi * pitch * k * time) / k for k in range(1, 6))
+                voice *= np.hanning(len(time)) * rng.uniform(2000, 6000)
+                gap = rng.uniform(0.03, 0.2)
+                pieces += [voice + rng.normal(0, 60, len(time)), rng.normal(0, 60, int(sample_rate * gap))]
+                t += length + gap
+            utterances.append([round(start, 3), round(t - gap, 3)])
+            pause = rng.uniform(1.0, 2.0)
+            pieces.append(rng.normal(0, 60, int(sample_rate * pause)))
+            t += pause
+
+        audio = np.clip(np.concatenate(pieces), -32768, 32767).astype(np.int16)
+        path = os.path.join(directory, f"synthetic_{n}")
+        with wave.open(path + ".wav", "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(sample_rate)
+            wf.writeframes(audio.tobytes())
+        with open(path + ".json", "w") as f:
+            json.dump({"utterances": utterances}, f)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="feed recorded mono wav fixtures through the vad endpointer and report endpoint latency "
+                    "and false cut-offs, each foo.wav needs a foo.json like {\"utterances\": [[start, end], ...]} in seconds"
+    )
+    parser.add_argument("fixtures", nargs="?", default="fixtures/vad", help="directory of wav + json fixtures")
+    parser.add_argument("--synthetic", action="store_true", help="write synthetic fixtures into the directory first (fixtures/vad is gitignored for these)")
+    parser.add_argument("--hangover", type=int, nargs="+", default=[200, 300, 500], help="hangover(s) to try, ms")
+    parser.add_argument("--threshold", type=float, default=300, help="energy threshold")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="seconds early an end can be and still count")
+    parser.add_argument("--json", action="store_true", help="print results as json lines")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        write_synthetic(args.fixtures)
+
+    paths = sorted(glob.glob(os.path.join(args.fixtures, "*.wav")))
+    if not paths:
+        parser.error(f"no wav fixtures in {args.fixtures} (try --synthetic)")
+    fixtures = [load_fixture(p) for p in paths]
+
+    for hangover in args.hangover:
+        latencies = []
+        false_cutoffs = 0
+        utterance_count = 0
+        for data, sample_rate, sample_width, utterances in fixtures:
+            phrases = run_endpointer(data, sample_rate, sample_width, hangover, args.threshold)
+            file_latencies, file_cutoffs = score(phrases, utterances, args.tolerance)
+            latencies += file_latencies
+            false_cutoffs += file_cutoffs
+            utterance_count += len(utterances)
+
+        result = {
+            "hangover_ms": hangover,
+            "files": len(fixtures),
+            "utterances": utterance_count,
+            "endpointed": len(latencies),
+            "false_cutoffs": false_cutoffs,
+            "latency_mean_ms": round(float(np.mean(latencies)) * 1000, 1) if latencies else None,
+            "latency_max_ms": round(float(np.max(latencies)) * 1000, 1) if latencies else None,
+        }
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(f"hangover {hangover} ms: {result['endpointed']}/{utterance_count} utterances endpointed, "
+                  f"{false_cutoffs} false cut-offs, latency mean {result['latency_mean_ms']} ms "
+                  f"max {result['latency_max_ms']} ms")
+    if not args.json:
+        print("(pause_threshold 1.5 s + 1000 ms padding is about 2500 ms before recognition even starts)")
+
+if __name__ == "__main__":
+    main()